@@ -0,0 +1,59 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException
+
+from .config import get_settings
+
+# Bearer tokens are "<user id>.<expiry, unix seconds>.<signature>", signed with AUTH_SECRET by
+# whichever service logs users in. Without a secret no token verifies and every caller is anonymous.
+
+
+def _sign(payload: str, secret: str) -> str:
+    return hmac.new(secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def issue_token(user_id: int, secret: str, ttl_seconds: float = 3600) -> str:
+    payload = f"{user_id}.{int(time.time() + ttl_seconds)}"
+    return f"{payload}.{_sign(payload, secret)}"
+
+
+def verify_token(token: str, secret: str) -> Optional[int]:
+    """The token's user id, or None if it is malformed, forged or expired"""
+    if not secret:
+        return None
+    try:
+        user_id, expires, signature = token.split(".")
+        payload = f"{int(user_id)}.{int(expires)}"
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(payload, secret)) or int(expires) < time.time():
+        return None
+    return int(user_id)
+
+
+def get_current_user(authorization: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    The authenticated user's id, or None for anonymous requests; a bad bearer
+    token is rejected. Without AUTH_SECRET, and for other schemes (e.g. Basic
+    credentials added by a proxy), the Authorization header is ignored.
+    """
+    secret = get_settings().auth_secret
+    if authorization is None or not secret:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    user_id = verify_token(token.strip(), secret)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return user_id
+
+
+def require_user(user_id: Optional[int] = Depends(get_current_user)) -> int:
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Authentication required", headers={"WWW-Authenticate": "Bearer"})
+    return user_id
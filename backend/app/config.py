@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,13 +7,103 @@ load_dotenv()
 class Settings:
     # Hugging Face Configuration
     huggingface_api_key: str = os.getenv("HUGGINGFACE_API_KEY", "")
+    huggingface_api_url: str = os.getenv("HUGGINGFACE_API_URL", "https://api-inference.huggingface.co/models")
+    summarization_model: str = os.getenv("SUMMARIZATION_MODEL", "facebook/bart-large-cnn")
+
+    # Upstream inference client
+    hf_timeout: float = float(os.getenv("HF_TIMEOUT", "30"))
+    hf_connect_timeout: float = float(os.getenv("HF_CONNECT_TIMEOUT", "5"))
+    hf_max_retries: int = int(os.getenv("HF_MAX_RETRIES", "4"))
+    hf_backoff_base: float = float(os.getenv("HF_BACKOFF_BASE", "0.5"))
+    hf_backoff_max: float = float(os.getenv("HF_BACKOFF_MAX", "20"))
+    hf_max_connections: int = int(os.getenv("HF_MAX_CONNECTIONS", "64"))
+    # Concurrent upstream calls adapt between these bounds, backing off when latency exceeds the target
+    hf_max_concurrency: int = int(os.getenv("HF_MAX_CONCURRENCY", "32"))
+    hf_min_concurrency: int = int(os.getenv("HF_MIN_CONCURRENCY", "2"))
+    hf_latency_target: float = float(os.getenv("HF_LATENCY_TARGET", "5"))
+    # Circuit breaker: open after consecutive failures or slow calls, then retry after a pause
+    hf_breaker_failures: int = int(os.getenv("HF_BREAKER_FAILURES", "5"))
+    hf_slow_call_seconds: float = float(os.getenv("HF_SLOW_CALL_SECONDS", "20"))
+    hf_breaker_open_seconds: float = float(os.getenv("HF_BREAKER_OPEN_SECONDS", "30"))
+    hf_breaker_half_open_calls: int = int(os.getenv("HF_BREAKER_HALF_OPEN_CALLS", "1"))
+    # Concurrent summarization inputs are sent as list-input micro-batches (1 disables batching)
+    hf_batch_size: int = int(os.getenv("HF_BATCH_SIZE", "8"))
+    hf_batch_wait: float = float(os.getenv("HF_BATCH_WAIT", "0.02"))
+    # Connections opened to the inference API by the startup warm-up
+    hf_warmup_connections: int = int(os.getenv("HF_WARMUP_CONNECTIONS", "4"))
+
+    # Analysis cache (set ANALYSIS_CACHE_DB to a sqlite path to persist across restarts)
+    cache_max_entries: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+    cache_ttl_seconds: float = float(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+    cache_db_path: str = os.getenv("ANALYSIS_CACHE_DB", "")
+
+    # Map-reduce summarization of long documents
+    summary_chunk_chars: int = int(os.getenv("SUMMARY_CHUNK_CHARS", "3000"))
+    summary_fanout: int = int(os.getenv("SUMMARY_FANOUT", "8"))
+    # Reduce levels before the remaining partial summaries are truncated into the final pass
+    summary_max_levels: int = int(os.getenv("SUMMARY_MAX_LEVELS", "4"))
+    # Expected length of a chunk's partial summary, which sets how many partials one reduce chunk takes in
+    summary_partial_chars: int = int(os.getenv("SUMMARY_PARTIAL_CHARS", "600"))
+    # Chunks summarized per document; 0 summarizes as many as summary_max_levels reduce levels can take in
+    # (about 1.5M characters with the defaults). Longer documents are sampled and report summary_coverage < 1.
+    summary_max_chunks: int = int(os.getenv("SUMMARY_MAX_CHUNKS", "0"))
+    # Documents at least this long are scanned for clauses in a worker thread, off the event loop
+    clause_scan_thread_chars: int = int(os.getenv("CLAUSE_SCAN_THREAD_CHARS", "100000"))
     
+    # Background analysis jobs ("memory" or "sqlite" backend)
+    job_backend: str = os.getenv("JOB_BACKEND", "sqlite")
+    job_spool_dir: str = os.getenv("JOB_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "legalsimplify-jobs"))
+    # Kept with the spooled files it refers to, independent of the working directory
+    job_db_path: str = os.getenv("JOB_DB_PATH", os.path.join(job_spool_dir, "jobs.db"))
+    # A running job's claim lapses (and the job is requeued) unless its process renews it within this time
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_max_queued: int = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+    job_per_client_running: int = int(os.getenv("JOB_PER_CLIENT_RUNNING", "2"))
+    job_result_ttl: float = float(os.getenv("JOB_RESULT_TTL", "86400"))
+    # Proxy addresses whose X-Client-Id header names the client a job is counted against
+    trusted_proxies: list = [host.strip() for host in os.getenv("TRUSTED_PROXIES", "").split(",") if host.strip()]
+
+    # Analysis history database (sqlite for local use and tests)
+    database_url: str = os.getenv("DATABASE_URL", "sqlite:///./legalsimplify.db")
+    history_batch_size: int = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+    history_flush_interval: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.5"))
+    history_max_pending: int = int(os.getenv("HISTORY_MAX_PENDING", "10000"))
+    # Secret that signs bearer tokens; history is only recorded and served when it is set
+    auth_secret: str = os.getenv("AUTH_SECRET", "")
+
+    # Clause rules and localized text
+    rules_path: str = os.getenv("RULES_PATH", os.path.join(os.path.dirname(__file__), "data", "rules.json"))
+
     # Application Settings
     cors_origins: list = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    # Expose per-stage durations to clients in a Server-Timing response header
+    server_timing: bool = os.getenv("SERVER_TIMING", "false").lower() == "true"
+    # Warm up at startup (upstream connections, clause matcher, extraction workers and parsers)
+    # instead of on the first requests; off by default to keep cold starts short
+    warmup: bool = os.getenv("WARMUP", "false").lower() == "true"
     
     # File Upload Limits
-    max_file_size: int = 10 * 1024 * 1024  # 10MB
+    max_file_size: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
+    # Whole request body, leaving room for multipart framing and form fields
+    max_request_size: int = int(os.getenv("MAX_REQUEST_SIZE", str(max_file_size + 1024 * 1024)))
+    upload_chunk_size: int = 64 * 1024
+    # Batch analysis: many files per request, analyzed with bounded concurrency
+    max_batch_request_size: int = int(os.getenv("MAX_BATCH_REQUEST_SIZE", str(200 * 1024 * 1024)))
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "16"))
+    upload_spool_threshold: int = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
     allowed_file_types: list = ["pdf", "doc", "docx", "txt"]
 
+    # Document extraction process pool (0 workers runs extraction in a thread instead)
+    extraction_workers: int = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    extraction_timeout: float = float(os.getenv("EXTRACTION_TIMEOUT", "60"))
+    extraction_memory_limit_mb: int = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024"))
+    pdf_pages_per_task: int = int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+
+    # Extraction budget for the "quick" analysis mode
+    quick_max_pages: int = int(os.getenv("QUICK_MAX_PAGES", "10"))
+    quick_max_chars: int = int(os.getenv("QUICK_MAX_CHARS", "20000"))
+
 def get_settings():
     return Settings()
\ No newline at end of file
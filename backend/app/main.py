@@ -1,20 +1,137 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import os
+import json
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import APIRouter, FastAPI, File, UploadFile, HTTPException, Request, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import List, Optional
 from .services.document_processor import DocumentProcessor
-from .services.ai_service import AIService, DocumentAnalysis
-from .middleware import add_security_headers
-from .config import get_settings
+from .services.ai_service import AIService
+from .services.jobs import Job, JobQueue, QueueFullError, create_job_store
+from .services.history import HistoryWriter
+from .services.cache import content_hash
+from .services.metrics import REGISTRY, request_timings
+from .schemas import DocumentAnalysis, BatchAnalysisResponse, BatchItemResult, JobStatus, HistoryItem, HistoryPage
+from .database import SessionLocal, init_db
+from .auth import get_current_user, require_user
+from .middleware import add_security_headers, add_server_timing, MaxBodySizeMiddleware
+from .config import Settings, get_settings
 from fastapi import Form
 
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """
+    The app's long-lived services, built by the lifespan handler when the server
+    starts rather than at import time, and handed to endpoints by get_services
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.document_processor = DocumentProcessor(settings)
+        self.ai_service = AIService(settings)
+        self.job_queue = JobQueue(
+            store=create_job_store(settings.job_backend, settings.job_db_path, settings.job_lease_seconds),
+            handler=self.run_job,
+            workers=settings.job_workers,
+            max_queued=settings.job_max_queued,
+            per_client_limit=settings.job_per_client_running,
+            result_ttl=settings.job_result_ttl,
+        )
+        self.history_writer = HistoryWriter(
+            SessionLocal,
+            batch_size=settings.history_batch_size,
+            flush_interval=settings.history_flush_interval,
+            max_pending=settings.history_max_pending,
+        )
+
+    async def start(self):
+        os.makedirs(self.settings.job_spool_dir, exist_ok=True)
+        init_db()
+        self.history_writer.start()
+        await self.job_queue.start()
+        if self.settings.warmup:
+            await self.warm_up()
+
+    async def warm_up(self):
+        """Pay first-request costs before serving; a failed step is logged and left to happen lazily"""
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            self.ai_service.warm_up(), self.document_processor.warm_up(), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Warm-up step failed: {str(result)}")
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    async def stop(self):
+        await self.job_queue.stop()
+        await self.history_writer.stop()
+        await self.ai_service.aclose()
+        self.document_processor.shutdown()
+
+    async def run_job(self, job: Job):
+        if job.file_path:
+            max_pages, max_chars = extraction_budget(job.mode)
+            extraction = await self.document_processor.extract_source(
+                job.file_path, job.filename, job.content_type, max_pages=max_pages, max_chars=max_chars
+            )
+            content = extraction.text
+        else:
+            content = job.text
+        return await self.ai_service.analyze_document(content, job.language)
+
+    def record_history(self, user_id: Optional[int], filename: Optional[str], content: str, language: str,
+                       analysis):
+        """Queue the analysis for the authenticated caller's history; anonymous requests are not recorded"""
+        if user_id is not None:
+            self.history_writer.record(user_id, filename, content_hash(content),
+                                       self.ai_service.rules.resolve_language(language), analysis)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services = Services(get_settings())
+    await services.start()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        await services.stop()
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+
 app = FastAPI(
     title="LegalSimplify API",
     version="1.0.0",
-    description="API backend for simplifying legal documents into plain language with multilingual support"
+    description="API backend for simplifying legal documents into plain language with multilingual support",
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_body_size=get_settings().max_request_size,
+    path_limits={"/analyze/batch": get_settings().max_batch_request_size},
 )
+app.middleware("http")(add_server_timing)
+
 
-document_processor = DocumentProcessor()
-ai_service = AIService()
+def extraction_budget(mode: str):
+    """Page and character budget for an analysis mode; "quick" only reads the start of the document"""
+    if mode == "quick":
+        settings = get_settings()
+        return settings.quick_max_pages, settings.quick_max_chars
+    if mode != "full":
+        raise HTTPException(status_code=400, detail="mode must be 'full' or 'quick'")
+    return None, None
 
 
 @app.get("/")
@@ -26,17 +143,23 @@ async def root():
 async def analyze_document(
     file: Optional[UploadFile] = File(None),
     text: Optional[str] = Form(None),
-    language: str = Form("english")
+    language: str = Form("english"),
+    mode: str = Form("full"),
+    user_id: Optional[int] = Depends(get_current_user),
+    services: Services = Depends(get_services)
 ):
+    max_pages, max_chars = extraction_budget(mode)
     try:
         if file:
-            content = await document_processor.process_uploaded_file(file)
+            extraction = await services.document_processor.extract(file, max_pages=max_pages, max_chars=max_chars)
+            content = extraction.text
         elif text:
             content = text
         else:
             raise HTTPException(status_code=400, detail="Either file or text must be provided")
         
-        analysis = await ai_service.analyze_document(content, language)
+        analysis = await services.ai_service.analyze_document(content, language)
+        services.record_history(user_id, file.filename if file else None, content, language, analysis)
         return analysis
 
     except HTTPException:
@@ -45,16 +168,261 @@ async def analyze_document(
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
 
+@app.post("/analyze/revision", response_model=DocumentAnalysis)
+async def analyze_revision(
+    file: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    language: str = Form("english"),
+    mode: str = Form("full"),
+    base_id: Optional[int] = Form(None),
+    base_hash: Optional[str] = Form(None),
+    user_id: Optional[int] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    """
+    Analyze a new version of a document against an earlier one, given by its history
+    id (base_id) or by the content_hash of its analysis; only changed sections are re-analyzed
+    """
+    max_pages, max_chars = extraction_budget(mode)
+    if base_id is not None and base_hash:
+        raise HTTPException(status_code=400, detail="Pass either base_id or base_hash, not both")
+    if base_id is not None:
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="base_id requires authentication",
+                                headers={"WWW-Authenticate": "Bearer"})
+        base = await services.history_writer.get_for_user(user_id, base_id)
+        if base is None:
+            raise HTTPException(status_code=404, detail="Base version not found in history")
+        base_hash = base["content_hash"]
+
+    if file:
+        extraction = await services.document_processor.extract(file, max_pages=max_pages, max_chars=max_chars)
+        content = extraction.text
+    elif text:
+        content = text
+    else:
+        raise HTTPException(status_code=400, detail="Either file or text must be provided")
+
+    try:
+        analysis = await services.ai_service.analyze_revision(content, language, base_hash)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
+    services.record_history(user_id, file.filename if file else None, content, language, analysis)
+    return analysis
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_document_stream(
+    file: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    language: str = Form("english"),
+    mode: str = Form("full"),
+    user_id: Optional[int] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    """
+    Server-sent events: extraction, clause, chunk_summary, then result (a DocumentAnalysis).
+    With SERVER_TIMING on, a final timing event carries the stage durations in milliseconds,
+    since the Server-Timing header went out before the analysis ran.
+    """
+    max_pages, max_chars = extraction_budget(mode)
+    if file:
+        extraction = await services.document_processor.extract(file, max_pages=max_pages, max_chars=max_chars)
+        content = extraction.text
+        extracted = {"page_count": extraction.page_count, "characters": len(content),
+                     "truncated": extraction.truncated}
+    elif text:
+        content = text
+        extracted = {"page_count": None, "characters": len(content), "truncated": False}
+    else:
+        raise HTTPException(status_code=400, detail="Either file or text must be provided")
+
+    async def events():
+        yield sse_event("extraction", extracted)
+        async for event, data in services.ai_service.analyze_document_stream(content, language):
+            if event == "result":
+                services.record_history(user_id, file.filename if file else None, content, language, data)
+                data = DocumentAnalysis(**data).model_dump(mode="json")
+            yield sse_event(event, data)
+        timings = request_timings()
+        if get_settings().server_timing and timings is not None:
+            yield sse_event("timing", {stage: round(elapsed * 1000, 1) for stage, elapsed in timings.items()})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    files: Optional[List[UploadFile]] = File(None),
+    texts: Optional[List[str]] = Form(None),
+    language: str = Form("english"),
+    mode: str = Form("full"),
+    services: Services = Depends(get_services)
+):
+    settings = get_settings()
+    items = [(file.filename, file) for file in files or []] + [(None, text) for text in texts or []]
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one file or text must be provided")
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_max_items} items per batch")
+
+    max_pages, max_chars = extraction_budget(mode)
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+
+    async def analyze_item(index: int, filename: Optional[str], item) -> BatchItemResult:
+        async with semaphore:
+            try:
+                if isinstance(item, str):
+                    content = item
+                else:
+                    extraction = await services.document_processor.extract(
+                        item, max_pages=max_pages, max_chars=max_chars
+                    )
+                    content = extraction.text
+                analysis = await services.ai_service.analyze_document(content, language)
+                return BatchItemResult(index=index, filename=filename, analysis=analysis)
+            except HTTPException as e:
+                return BatchItemResult(index=index, filename=filename, error=str(e.detail))
+            except Exception as e:
+                return BatchItemResult(index=index, filename=filename, error=f"Analysis error: {str(e)}")
+
+    # Items run concurrently; their upstream summarization calls are merged into micro-batches
+    results = await asyncio.gather(*(
+        analyze_item(index, filename, item) for index, (filename, item) in enumerate(items)
+    ))
+    return BatchAnalysisResponse(results=results)
+
+
+def job_status(job: Job) -> JobStatus:
+    timestamp = lambda value: datetime.utcfromtimestamp(value) if value else None
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        created_at=timestamp(job.created_at),
+        started_at=timestamp(job.started_at),
+        finished_at=timestamp(job.finished_at),
+        result=job.result,
+        error=job.error,
+    )
+
+
+def job_client_id(request: Request, user_id: Optional[int]) -> str:
+    """
+    Who a job counts against for fairness: the authenticated user, else the
+    caller's address. X-Client-Id is only honoured from a trusted proxy, since
+    any other caller could send a fresh id with each job.
+    """
+    if user_id is not None:
+        return f"user:{user_id}"
+    host = request.client.host if request.client else "anonymous"
+    forwarded = request.headers.get("X-Client-Id")
+    if forwarded and host in get_settings().trusted_proxies:
+        return f"client:{forwarded}"
+    return host
+
+
+def queue_full() -> HTTPException:
+    return HTTPException(status_code=503, detail="Job queue is full, retry later", headers={"Retry-After": "5"})
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    language: str = Form("english"),
+    mode: str = Form("full"),
+    priority: int = Form(0, ge=-10, le=10),
+    user_id: Optional[int] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    extraction_budget(mode)
+    if await services.job_queue.is_full():
+        raise queue_full()
+
+    job = Job(client_id=job_client_id(request, user_id), language=language, mode=mode, priority=priority)
+    if file:
+        upload = await services.document_processor.spool(file)
+        job.file_path = os.path.join(get_settings().job_spool_dir, job.id)
+        job.filename = file.filename
+        job.content_type = file.content_type
+        await asyncio.to_thread(upload.save, job.file_path)
+    elif text:
+        job.text = text
+    else:
+        raise HTTPException(status_code=400, detail="Either file or text must be provided")
+
+    try:
+        await services.job_queue.submit(job)
+    except QueueFullError:
+        if job.file_path:
+            os.unlink(job.file_path)
+        raise queue_full()
+    return job_status(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, services: Services = Depends(get_services)):
+    job = await services.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+# History is per user, so it is only served when requests can be authenticated (AUTH_SECRET is set)
+history_router = APIRouter()
+
+
+@history_router.get("/history", response_model=HistoryPage)
+async def list_history(
+    user_id: int = Depends(require_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    full: bool = False,
+    services: Services = Depends(get_services)
+):
+    """Newest-first analysis history; pass next_cursor back as cursor for the following page"""
+    try:
+        items, next_cursor = await services.history_writer.list_for_user(user_id, limit, cursor, full)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+
+@history_router.get("/history/{history_id}", response_model=HistoryItem)
+async def get_history_item(
+    history_id: int,
+    user_id: int = Depends(require_user),
+    services: Services = Depends(get_services)
+):
+    item = await services.history_writer.get_for_user(user_id, history_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="History item not found")
+    return item
+
+
+if get_settings().auth_secret:
+    app.include_router(history_router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/languages")
-async def get_supported_languages():
+async def get_supported_languages(services: Services = Depends(get_services)):
     return {
-        "languages": [
-            {"code": "en", "name": "English"},
-            {"code": "hi", "name": "Hindi"},
-            {"code": "bn", "name": "Bengali"},
-            {"code": "ta", "name": "Tamil"},
-            {"code": "te", "name": "Telugu"},
-        ]
+        "languages": [{"code": code, "name": name} for code, name in services.ai_service.rules.languages]
     }
 
 
@@ -1,6 +1,10 @@
-from fastapi import Request
+import time
+from typing import Dict, Optional
+from fastapi import Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import get_settings
+from app.services.metrics import REQUEST_SECONDS, server_timing_header, start_request_timings
 
 settings = get_settings()
 
@@ -13,4 +17,59 @@ async def add_security_headers(request: Request, call_next):
     response.headers["X-XSS-Protection"] = "1; mode=block"
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
     response.headers["Content-Security-Policy"] = "default-src 'self'"
-    return response
\ No newline at end of file
+    return response
+
+# Request latency metrics, plus per-stage durations in a Server-Timing header when enabled.
+# Latency is observed once the body has been sent, so streamed responses (/analyze/stream) count
+# their whole stream; their Server-Timing header only covers the stages before the first event.
+async def add_server_timing(request: Request, call_next):
+    start = time.perf_counter()
+    timings = start_request_timings()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    labels = dict(method=request.method, route=getattr(route, "path", "unmatched"), status=str(response.status_code))
+    if settings.server_timing:
+        response.headers["Server-Timing"] = server_timing_header(timings, time.perf_counter() - start)
+
+    body = response.body_iterator
+
+    async def observed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, **labels)
+
+    response.body_iterator = observed_body()
+    return response
+
+# Request body size limit, enforced before and while the body is read
+class MaxBodySizeMiddleware:
+    def __init__(self, app, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        max_body_size = self.path_limits.get(scope.get("path", ""), self.max_body_size)
+        detail = f"Request body too large. Maximum size is {max_body_size // (1024 * 1024)}MB."
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > max_body_size:
+                response = JSONResponse({"detail": detail}, status_code=413)
+                return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
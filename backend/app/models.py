@@ -1,6 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey, Index
+from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
 Base = declarative_base()
@@ -22,8 +21,17 @@ class DocumentHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     filename = Column(String)
+    content_hash = Column(String(64))  # sha256 of the normalized text, for deduplication
+    language = Column(String(16))
+    summary = Column(Text)
     analysis_result = Column(JSON)  # Store the full analysis result
     risk_score = Column(Float)
     analyzed_at = Column(DateTime, default=datetime.utcnow)
     
-    user = relationship("User", back_populates="documents")
\ No newline at end of file
+    user = relationship("User", back_populates="documents")
+
+    __table_args__ = (
+        # Keyset pagination of a user's history, newest first
+        Index("ix_document_history_user_analyzed", "user_id", "analyzed_at", "id"),
+        Index("ix_document_history_user_hash", "user_id", "content_hash"),
+    )
\ No newline at end of file
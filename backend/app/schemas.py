@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 from enum import Enum
 
 class RiskLevel(str, Enum):
@@ -7,11 +8,34 @@ class RiskLevel(str, Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+class ClauseMatch(BaseModel):
+    keyword: str
+    start: int  # character offsets into the extracted text
+    end: int
+    sentence: str
+
 class Clause(BaseModel):
     type: str
     description: str
     risk_level: RiskLevel
     explanation: str
+    occurrences: int = 0
+    matches: List[ClauseMatch] = []
+
+class ClauseChanges(BaseModel):
+    added: List[str] = []  # clause types
+    removed: List[str] = []
+    changed: List[str] = []  # in both versions, but found in an added, edited or removed section
+
+class RevisionInfo(BaseModel):
+    content_hash: str  # pass as base_hash when analyzing the next version
+    base_hash: Optional[str] = None
+    base_found: bool = False  # False when the base version was never analyzed as a revision (or has expired)
+    sections: int
+    sections_reused: int
+    sections_analyzed: int
+    sections_removed: int
+    clause_changes: ClauseChanges
 
 class DocumentAnalysis(BaseModel):
     summary: str
@@ -19,6 +43,41 @@ class DocumentAnalysis(BaseModel):
     clauses: List[Clause]
     risk_score: float  # 0.0 to 1.0
     recommended_actions: List[str]
+    degraded: bool = False  # no model summary; clauses and risk score are still complete
+    summary_coverage: Optional[float] = None  # share of the document's chunks summarized; below 1.0 if sampled
+    revision: Optional[RevisionInfo] = None  # only from /analyze/revision
+
+class BatchItemResult(BaseModel):
+    index: int
+    filename: Optional[str] = None
+    analysis: Optional[DocumentAnalysis] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchItemResult]
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, done or failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[DocumentAnalysis] = None
+    error: Optional[str] = None
+
+class HistoryItem(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    content_hash: Optional[str] = None
+    language: Optional[str] = None
+    summary: Optional[str] = None
+    risk_score: Optional[float] = None
+    analyzed_at: datetime
+    analysis_result: Optional[DocumentAnalysis] = None  # only when the full result is requested
+
+class HistoryPage(BaseModel):
+    items: List[HistoryItem]
+    next_cursor: Optional[str] = None
 
 class AnalysisRequest(BaseModel):
     text: Optional[str] = None
@@ -1,8 +1,18 @@
-import requests
-import os
+import asyncio
+import hashlib
 import logging
-import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+
+from ..config import Settings, get_settings
+from .batching import MicroBatcher
+from .cache import AnalysisCache, analysis_key, content_hash
+from .chunking import section_texts
+from .clause_matcher import ClauseHits, ClauseMatcher
+from .hf_client import HuggingFaceClient, HuggingFaceError
+from .metrics import DEGRADED_ANALYSES, DOCUMENT_CHARS, REVISION_SECTIONS, timed
+from .revisions import Section, diff_revision, hits_to_json, manifest_key, merge_hits, split_into_sections
+from .rules import load_rules
+from .singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -14,96 +24,422 @@ if not logger.handlers:
     logger.addHandler(ch)
 
 class AIService:
-    def __init__(self):
-        self.huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY", "")
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.huggingface_api_key = self.settings.huggingface_api_key
         self.mock_mode = not self.huggingface_api_key
-        self.summarization_model = "facebook/bart-large-cnn"
-        self.api_url = f"https://api-inference.huggingface.co/models/{self.summarization_model}"
+        self.summarization_model = self.settings.summarization_model
+        self.client = HuggingFaceClient(self.settings)
+        self.batcher = MicroBatcher(self.client, self.settings.hf_batch_size, self.settings.hf_batch_wait)
+        self.cache = AnalysisCache(
+            max_entries=self.settings.cache_max_entries,
+            ttl_seconds=self.settings.cache_ttl_seconds,
+            db_path=self.settings.cache_db_path or None,
+        )
+        self.chunk_cache = AnalysisCache(
+            max_entries=self.settings.cache_max_entries * 8,
+            ttl_seconds=self.settings.cache_ttl_seconds,
+            db_path=self.settings.cache_db_path or None,
+            namespace="chunk",
+        )
+        # Section manifests of analyzed versions, for revision-aware re-analysis
+        self.revision_cache = AnalysisCache(
+            max_entries=self.settings.cache_max_entries,
+            ttl_seconds=self.settings.cache_ttl_seconds,
+            db_path=self.settings.cache_db_path or None,
+            namespace="revision",
+        )
+        self.rules = load_rules(self.settings.rules_path)
+        self.clause_matcher = ClauseMatcher(self.rules.keyword_patterns())
+        self._inflight = SingleFlight("analysis")
+        self._chunk_inflight = SingleFlight("chunk")
+
+    async def warm_up(self) -> None:
+        """Build the clause matcher and open upstream connections ahead of the first request"""
+        self.clause_matcher.compile()
+        if not self.mock_mode:
+            await self.client.warm_up(self.settings.hf_warmup_connections)
+
+    async def aclose(self) -> None:
+        await self.batcher.close()
+        await self.client.aclose()
+        self.cache.close()
+        self.chunk_cache.close()
+        self.revision_cache.close()
 
     async def analyze_document(self, content: str, language: str = "en") -> Dict[str, Any]:
         """Analyze document and return multilingual summary, clauses, risk score, and recommendations"""
+        DOCUMENT_CHARS.observe(len(content))
+        language = self.rules.resolve_language(language)
         try:
             if self.mock_mode:
                 logger.info("Using mock mode - no API key provided")
                 return await self._mock_analysis(content, language)
 
-            summary = await self._get_summary(content, language)
-            analysis = await self._analyze_content(content, summary, language)
+            cache_key = analysis_key(content, language, self.summarization_model, self.rules.fingerprint)
+            cached = await self.cache.get(cache_key)
+            entries, record, clauses = await self._detect_clauses(content, language, cached)
+            coverage = self._summary_coverage(record["sections"])
+            if cached is not None:
+                return self._build_analysis(cached["summary"], clauses, language, coverage=coverage)
+            # Lets a later /analyze/revision of this document reuse its sections
+            await self._store_manifest(content, language, entries)
+
+            if self.client.breaker.is_open:
+                # Upstream is known to be down: answer locally instead of waiting for it to fail
+                return self._degraded_analysis(clauses, language)
+
+            # Identical documents analyzed concurrently share one upstream computation
+            summary = await self._inflight.do(
+                cache_key, lambda: self._summarize_document(content, language, cache_key, record)
+            )
+            if summary is None:
+                # Upstream failed: answer with the local analysis
+                return self._degraded_analysis(clauses, language)
+            return self._build_analysis(summary, clauses, language, coverage=coverage)
+
+        except Exception as e:
+            logger.error(f"AI analysis error: {str(e)}")
+            return await self._mock_analysis(content, language)
+
+    async def _summarize_document(self, content: str, language: str, cache_key: str, record: Dict[str, Any],
+                                  on_partial: Optional[Callable[[int, int, str], None]] = None) -> Optional[str]:
+        """
+        The document's summary, cached under its analysis key with the clause
+        record from _detect_clauses, unless the API gave none
+        """
+        with timed("summarization"):
+            summary = await self._get_summary(content, language, on_partial)
+        if summary is not None:
+            await self.cache.set(cache_key, dict(record, summary=summary))
+        return summary
+
+    async def analyze_document_stream(self, content: str, language: str = "en") -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Analyze document, yielding (event, data) pairs as stages complete: each
+        detected clause, each chunk summary, then the final analysis as "result".
+        The summary is shared with concurrent requests for the same document; a
+        stream that joins a computation another request started gets no chunk
+        summaries, only the result.
+        """
+        DOCUMENT_CHARS.observe(len(content))
+        language = self.rules.resolve_language(language)
+        try:
+            if self.mock_mode:
+                logger.info("Using mock mode - no API key provided")
+                yield "result", await self._mock_analysis(content, language)
+                return
+
+            cache_key = analysis_key(content, language, self.summarization_model, self.rules.fingerprint)
+            cached = await self.cache.get(cache_key)
+            # Clause detection does not depend on the summary, so report it before the model answers
+            entries, record, clauses = await self._detect_clauses(content, language, cached)
+            for clause in clauses:
+                yield "clause", clause
+            coverage = self._summary_coverage(record["sections"])
+            if cached is not None:
+                yield "result", self._build_analysis(cached["summary"], clauses, language, coverage=coverage)
+                return
+            await self._store_manifest(content, language, entries)
+
+            if self.client.breaker.is_open:
+                yield "result", self._degraded_analysis(clauses, language)
+                return
+
+            events: asyncio.Queue = asyncio.Queue()
+            on_partial = lambda index, total, summary: events.put_nowait(
+                ("chunk_summary", {"index": index, "total": total, "summary": summary})
+            )
+            # Timed and cached inside _summarize_document, so the timer does not include time spent in yields
+            task = asyncio.ensure_future(self._inflight.do(
+                cache_key, lambda: self._summarize_document(content, language, cache_key, record, on_partial)
+            ))
+            task.add_done_callback(lambda _: events.put_nowait(None))
+            try:
+                while (event := await events.get()) is not None:
+                    yield event
+                summary = task.result()
+            finally:
+                task.cancel()
+            yield "result", (self._build_analysis(summary, clauses, language, coverage=coverage)
+                             if summary is not None else self._degraded_analysis(clauses, language))
+
+        except Exception as e:
+            logger.error(f"AI analysis error: {str(e)}")
+            yield "result", await self._mock_analysis(content, language)
+
+    async def analyze_revision(self, content: str, language: str = "en",
+                               base_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Revision-aware analysis: the document is split into content-hashed sections,
+        and sections the base version (identified by its content_hash) already had
+        reuse its summaries and clause hits, so only changed sections are summarized
+        and scanned. The result's "revision" reports what was reused and which clause
+        types were added, removed or changed.
+        """
+        DOCUMENT_CHARS.observe(len(content))
+        language = self.rules.resolve_language(language)
+        try:
+            base = None
+            if base_hash:
+                manifest = await self.revision_cache.get(
+                    manifest_key(base_hash, language, self.summarization_model, self.rules.fingerprint)
+                )
+                base = manifest["sections"] if manifest is not None else None
+            known = {entry["hash"]: entry for entry in base or ()}
+            sections, entries, found = await self._scan_sections(content, known)
+            clauses = self._clauses_from_hits(found, language)
+
+            if self.mock_mode:
+                logger.info("Using mock mode - no API key provided")
+                analysis = self._build_analysis(await self._get_mock_summary(content, language), clauses, language)
+            elif self.client.breaker.is_open:
+                analysis = self._degraded_analysis(clauses, language)
+            else:
+                with timed("summarization"):
+                    summary = await self._get_revision_summary(sections, entries, language)
+                analysis = (self._build_analysis(summary, clauses, language,
+                                                 coverage=self._summary_coverage(len(sections)))
+                            if summary is not None else self._degraded_analysis(clauses, language))
+
+            # Stored even without summaries: clause hits are reused and missing summaries filled in next time
+            document_hash = await self._store_manifest(content, language, entries)
+            revision = diff_revision(base, entries, self.clause_matcher.clause_types)
+            REVISION_SECTIONS.inc(revision["sections_reused"], result="reused")
+            REVISION_SECTIONS.inc(revision["sections_analyzed"], result="analyzed")
+            analysis["revision"] = dict(revision, content_hash=document_hash, base_hash=base_hash,
+                                        base_found=base is not None)
             return analysis
 
         except Exception as e:
             logger.error(f"AI analysis error: {str(e)}")
             return await self._mock_analysis(content, language)
 
-    async def _get_summary(self, content: str, language: str) -> str:
-        """Get summary using Hugging Face API with multilingual prompts"""
+    async def _detect_clauses(self, content: str, language: str, cached: Optional[Dict[str, Any]]
+                              ) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        The document's clauses, as (manifest entries, clause record, clauses). The
+        record (exact-text hash, section count and clause hits) is cached with the
+        summary, so a cached analysis of this exact text is answered without a scan
+        (entries is then None). Offsets index into the exact text, so another upload
+        of the same normalized content is scanned again.
+        """
+        text_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if cached is not None and cached.get("text_hash") == text_hash:
+            entries, record = None, cached
+        else:
+            _, entries, found = await self._scan_sections(content)
+            record = {"text_hash": text_hash, "sections": len(entries), "clauses": hits_to_json(found)}
+        found = merge_hits([(0, record["clauses"])], self.clause_matcher.clause_types, self.clause_matcher.max_evidence)
+        return entries, record, self._clauses_from_hits(found, language)
+
+    async def _scan_sections(self, content: str, known: Optional[Dict[str, Dict[str, Any]]] = None
+                             ) -> Tuple[List[Section], List[Dict[str, Any]], Dict[str, ClauseHits]]:
+        """
+        Split the document into content-hashed sections and find clause hits in
+        each, reusing the manifest entries in known (by section hash). Returns the
+        sections, their manifest entries and the document's hits. Long documents
+        are scanned in a worker thread so other requests are not held up.
+        """
+        if len(content) < self.settings.clause_scan_thread_chars:
+            return self._scan(content, known or {})
+        return await asyncio.to_thread(self._scan, content, known or {})
+
+    def _scan(self, content: str, known: Dict[str, Dict[str, Any]]
+              ) -> Tuple[List[Section], List[Dict[str, Any]], Dict[str, ClauseHits]]:
+        sections = split_into_sections(content, self.settings.summary_chunk_chars)
+        entries = []
+        with timed("clause_scan"):
+            for section in sections:
+                entry = known.get(section.hash)
+                if entry is None:
+                    entry = {"hash": section.hash, "summary": None,
+                             "clauses": hits_to_json(self.clause_matcher.find(section.text))}
+                entries.append(entry)
+        found = merge_hits(
+            ((section.start, entry["clauses"]) for section, entry in zip(sections, entries)),
+            self.clause_matcher.clause_types, self.clause_matcher.max_evidence,
+        )
+        return sections, entries, found
+
+    async def _store_manifest(self, content: str, language: str, entries: List[Dict[str, Any]]) -> str:
+        """
+        Record a version's section manifest under its content_hash, which is returned.
+        Sections without a summary entry are answered from the chunk cache when a
+        revision reuses them, since /analyze summarizes the same sections.
+        """
+        document_hash = content_hash(content)
+        await self.revision_cache.set(
+            manifest_key(document_hash, language, self.summarization_model, self.rules.fingerprint),
+            {"sections": entries},
+        )
+        return document_hash
+
+    async def _get_summary(self, content: str, language: str,
+                           on_partial: Optional[Callable[[int, int, str], None]] = None) -> Optional[str]:
+        """
+        Map-reduce summary: summarize clause-aligned chunks concurrently, then
+        summarize the partial summaries. Returns None if the API gave no summary.
+        on_partial is called with each first-level chunk summary as it arrives.
+        Chunk boundaries are content-defined, so after an edit the chunks away
+        from it are unchanged and answered from the chunk cache.
+        """
         if self.mock_mode:
-            return await self._get_mock_summary(content, language)
+            return None
 
-        headers = {"Authorization": f"Bearer {self.huggingface_api_key}"}
-        truncated_content = content[:1500]
+        chunk_chars = self.settings.summary_chunk_chars
+        chunks = self._limit_chunks(section_texts(content, chunk_chars))
+        if not chunks:
+            return None
+        return await self._reduce_summaries(
+            chunks, language, lambda text: section_texts(text, chunk_chars), on_partial
+        )
 
-        prompts = {
-            "en": f"Summarize this legal document in simple, plain English: {truncated_content}",
-            "bn": f"এই আইনী দলিলটি সরল, স্পষ্ট বাংলায় সংক্ষিপ্ত করুন: {truncated_content}",
-            "hi": f"इस कानूनी दस्तावेज़ को सरल, स्पष्ट हिंदी में संक्षेप में प्रस्तुत करें: {truncated_content}",
-            "ta": f"இந்த சட்ட ஆவணத்தை எளிய, தெளிவான தமிழில் சுருக்கவும்: {truncated_content}",
-            "te": f"ఈ చట్టపరమైన పత్రాన్ని సరళమైన, స్పష్టమైన తెలుగులో సంగ్రహించండి: {truncated_content}"
-        }
+    async def _reduce_summaries(self, chunks: List[str], language: str, split: Callable[[str], List[str]],
+                                on_partial: Optional[Callable[[int, int, str], None]] = None) -> Optional[str]:
+        """
+        Summarize chunks level by level, re-splitting the joined partial summaries,
+        until one remains. If a level does not reduce the number of chunks (the
+        model is not shortening its input) or summary_max_levels is reached, the
+        final summary is taken over the start of the joined partials instead.
+        """
+        level = 0
+        while len(chunks) > 1:
+            partials = await self._summarize_chunks(chunks, language, final=False, on_partial=on_partial)
+            if partials is None:
+                return None
+            joined = "\n\n".join(partials)
+            reduced = split(joined)
+            level += 1
+            on_partial = None
+            if len(reduced) > 1 and (len(reduced) >= len(chunks) or level >= self.settings.summary_max_levels):
+                logger.warning(f"Summaries stopped shrinking after {level} levels ({len(reduced)} chunks), "
+                               f"truncating for the final summary")
+                return await self._summarize_text(joined[:self.settings.summary_chunk_chars], language, final=True)
+            chunks = reduced
 
-        prompt = prompts.get(language, prompts["en"])
-        payload = {
-            "inputs": prompt,
-            "parameters": {"max_length": 200, "min_length": 80, "do_sample": False, "temperature": 0.3}
-        }
+        return await self._summarize_text(chunks[0], language, final=True)
+
+    async def _get_revision_summary(self, sections: List[Section], entries: List[Dict[str, Any]],
+                                    language: str) -> Optional[str]:
+        """
+        Map-reduce summary over sections, calling the model only for sections whose
+        manifest entry has no summary yet (entries are filled in place). The joined
+        partial summaries are re-split on content-defined boundaries as well, so the
+        reduce chunks a revision leaves untouched are answered from the chunk cache.
+        """
+        chunk_chars = self.settings.summary_chunk_chars
+        indexes = self._limit_chunks(list(range(len(sections))))
+        if not indexes:
+            return None
+        if len(indexes) == 1:
+            return await self._summarize_text(sections[indexes[0]].text, language, final=True)
+
+        missing = [index for index in indexes if entries[index]["summary"] is None]
+        partials = await self._summarize_chunks([sections[index].text for index in missing], language, final=False)
+        if partials is None:
+            return None
+        for index, partial in zip(missing, partials):
+            entries[index]["summary"] = partial
+
+        split = lambda text: section_texts(text, chunk_chars)
+        return await self._reduce_summaries(
+            split("\n\n".join(entries[index]["summary"] for index in indexes)), language, split
+        )
+
+    def _max_summary_chunks(self) -> int:
+        """
+        summary_max_chunks, or by default the most chunks the reduce levels can
+        summarize in full: each reduce chunk takes in the partial summaries of
+        about summary_chunk_chars / summary_partial_chars chunks
+        """
+        if self.settings.summary_max_chunks > 0:
+            return self.settings.summary_max_chunks
+        fan_in = max(2, self.settings.summary_chunk_chars // max(1, self.settings.summary_partial_chars))
+        return fan_in ** max(1, self.settings.summary_max_levels)
+
+    def _summary_coverage(self, chunk_count: int) -> float:
+        """Share of a document's chunks that _limit_chunks keeps for the summary"""
+        return min(1.0, self._max_summary_chunks() / chunk_count) if chunk_count else 1.0
+
+    def _limit_chunks(self, chunks: List[str]) -> List[str]:
+        """Keep at most _max_summary_chunks() chunks, sampled evenly across the whole document"""
+        limit = self._max_summary_chunks()
+        if len(chunks) <= limit:
+            return chunks
+        logger.warning(f"Document has {len(chunks)} chunks, summarizing only {limit} spread across it")
+        step = len(chunks) / limit
+        return [chunks[int(i * step)] for i in range(limit)]
+
+    async def _summarize_chunks(self, chunks: List[str], language: str, final: bool,
+                                on_partial: Optional[Callable[[int, int, str], None]] = None) -> Optional[List[str]]:
+        """Summarize chunks concurrently with a bounded fan-out, preserving order"""
+        semaphore = asyncio.Semaphore(self.settings.summary_fanout)
+
+        async def summarize(index: int, chunk: str) -> Optional[str]:
+            async with semaphore:
+                summary = await self._summarize_text(chunk, language, final)
+            if summary is not None and on_partial is not None:
+                on_partial(index, len(chunks), summary)
+            return summary
+
+        partials = await asyncio.gather(*(summarize(index, chunk) for index, chunk in enumerate(chunks)))
+        if any(partial is None for partial in partials):
+            return None
+        return list(partials)
+
+    async def _summarize_text(self, text: str, language: str, final: bool) -> Optional[str]:
+        """Summarize a single chunk, reusing cached and in-flight results for identical chunks"""
+        cache_key = analysis_key(text, f"{language}:{'final' if final else 'map'}", self.summarization_model,
+                                 self.rules.fingerprint)
+        cached = await self.chunk_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async def fetch() -> Optional[str]:
+            summary = await self._query_summary(text, language, final)
+            if summary is not None:
+                await self.chunk_cache.set(cache_key, summary)
+            return summary
+
+        return await self._chunk_inflight.do(cache_key, fetch)
+
+    async def _query_summary(self, text: str, language: str, final: bool) -> Optional[str]:
+        """Get summary using Hugging Face API with multilingual prompts"""
+        prompt = self.rules.text("summary_prompt", language).format(text=text)
+        if final:
+            parameters = {"max_length": 200, "min_length": 80, "do_sample": False, "temperature": 0.3}
+        else:
+            parameters = {"max_length": 120, "min_length": 30, "do_sample": False, "temperature": 0.3}
 
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload)
-
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    summary_text = result[0].get('summary_text', None)
-                    if not summary_text:
-                        return await self._get_mock_summary(content, language)
+            # Concurrent chunks (and batch items) with the same parameters share one list-input request
+            result = await self.batcher.query(prompt, parameters)
+            if result:
+                summary_text = result.get('summary_text', None)
+                if summary_text:
                     return summary_text
-                return await self._get_mock_summary(content, language)
-            elif response.status_code == 503:
-                logger.info("Model loading, retrying in 10s...")
-                time.sleep(10)
-                return await self._get_summary(content, language)
-            else:
-                error_msg = response.json().get('error', 'Unknown error')
-                logger.error(f"Hugging Face API error: {error_msg}")
-                return await self._get_mock_summary(content, language)
+            return None
 
-        except Exception as e:
+        except HuggingFaceError as e:
             logger.error(f"Hugging Face API call failed: {str(e)}")
-            return await self._get_mock_summary(content, language)
+            return None
 
-    async def _analyze_content(self, content: str, summary: str, language: str) -> Dict[str, Any]:
-        """Analyze document content for clauses, risks, and multilingual explanations"""
+    def _clauses_from_hits(self, found: Dict[str, ClauseHits], language: str) -> List[Dict[str, Any]]:
         clauses = []
-
-        clause_patterns = {
-            "indemnification": ["indemnify", "indemnification", "hold harmless", "ক্ষতিপূরণ", "क्षतिपूर्ति", "பழிவாங்கல்", "పరిహారం"],
-            "liability": ["liability", "liable", "damages", "compensate", "দায়", "दायित्व", "பொறுப்பு", "బాధ్యత"],
-            "termination": ["terminate", "termination", "expire", "cancel", "সমাপ্তি", "समाप्ति", "முடிவு", "ముగింపు"],
-            "confidentiality": ["confidential", "non-disclosure", "nda", "secret", "গোপনীয়", "गोपनीय", "ரகசிய", "గోప్య"],
-            "payment": ["payment", "fee", "compensation", "price", "পেমেন্ট", "भुगतान", "கட்டணம்", "చెల్లింపు"],
-            "warranty": ["warranty", "guarantee", "warrant", "ওয়ারেন্টি", "वारंटी", "உத்தரவாதம்", "వారంటీ"]
-        }
-
-        content_lower = content.lower()
-        for clause_type, keywords in clause_patterns.items():
-            if any(keyword in content_lower for keyword in keywords):
-                risk_level = self._determine_risk_level(clause_type)
-                clauses.append({
-                    "type": clause_type,
-                    "description": self._get_clause_description(clause_type, language),
-                    "risk_level": risk_level,
-                    "explanation": self._get_clause_explanation(clause_type, risk_level, language)
-                })
+        for clause_type, hits in found.items():
+            risk_level = self._determine_risk_level(clause_type)
+            clauses.append({
+                "type": clause_type,
+                "description": self._get_clause_description(clause_type, language),
+                "risk_level": risk_level,
+                "explanation": self._get_clause_explanation(clause_type, risk_level, language),
+                "occurrences": hits.count,
+                "matches": [
+                    {"keyword": m.keyword, "start": m.start, "end": m.end, "sentence": m.sentence}
+                    for m in hits.matches
+                ]
+            })
 
         if not clauses:
             clauses.append({
@@ -112,7 +448,10 @@ class AIService:
                 "risk_level": "low",
                 "explanation": self._get_clause_explanation("general", "low", language)
             })
+        return clauses
 
+    def _build_analysis(self, summary: str, clauses: List[Dict[str, Any]], language: str,
+                        degraded: bool = False, coverage: Optional[float] = None) -> Dict[str, Any]:
         risk_score = self._calculate_risk_score(clauses)
         plain_language = self._create_plain_language(summary, language)
 
@@ -121,97 +460,37 @@ class AIService:
             "plain_language": plain_language,
             "clauses": clauses,
             "risk_score": risk_score,
-            "recommended_actions": self._get_recommended_actions(risk_score, language)
+            "recommended_actions": self._get_recommended_actions(risk_score, language),
+            "degraded": degraded,
+            "summary_coverage": coverage
         }
 
+    def _degraded_analysis(self, clauses: List[Dict[str, Any]], language: str) -> Dict[str, Any]:
+        """Local-only analysis for when the model is unavailable: clauses and risk score, no summary"""
+        DEGRADED_ANALYSES.inc()
+        return self._build_analysis(self._get_unavailable_summary(language), clauses, language, degraded=True)
+
     def _determine_risk_level(self, clause_type: str) -> str:
-        mapping = {
-            "indemnification": "medium",
-            "liability": "medium",
-            "confidentiality": "medium",
-            "warranty": "low",
-            "payment": "low",
-            "termination": "low",
-            "general": "low"
-        }
-        return mapping.get(clause_type, "low")
+        return self.rules.risk_level(clause_type)
 
     def _get_clause_description(self, clause_type: str, language: str) -> str:
-        descriptions = {
-            "indemnification": {
-                "en": "This clause requires one party to compensate the other for losses or damages.",
-                "bn": "এই ধারাটি অন্য পক্ষকে ক্ষতি বা ক্ষতিপূরণের জন্য ক্ষতিপূরণ দিতে বলে।",
-                "hi": "यह खंड एक पक्ष को नुकसान या क्षति के लिए दूसरे पक्ष को मुआवजा देने की आवश्यकता है।",
-                "ta": "இந்த விதி, இழப்புகள் அல்லது சேதங்களுக்கு ஒரு தரப்பு மற்ற தரப்புக்கு ஈடுசெய்ய வேண்டும்.",
-                "te": "ఈ నిబంధన ఒక పక్షాన్ని నష్టాల కోసం మరొక పక్షానికి పరిహారం చెల్లించడానికి చెప్పిస్తుంది."
-            },
-            "general": {
-                "en": "This appears to be a standard legal agreement.",
-                "bn": "এটি একটি মানক আইনী চুক্তি বলে মনে হচ্ছে।",
-                "hi": "यह एक मानक कानूनी समझौता प्रतीत होता है।",
-                "ta": "இது ஒரு நிலையான சட்ட ஒப்பந்தம் போல் தெரிகிறது.",
-                "te": "ఇది ఒక ప్రామాణిక చట్టపరమైన ఒప్పందం."
-            }
-        }
-        return descriptions.get(clause_type, descriptions["general"]).get(language, descriptions["general"]["en"])
+        return self.rules.description(clause_type, language)
 
     def _get_clause_explanation(self, clause_type: str, risk_level: str, language: str) -> str:
-        explanations = {
-            "indemnification": {
-                "en": "Can create significant financial obligations if things go wrong.",
-                "bn": "যদি কিছু ভুল হয় তবে উল্লেখযোগ্য আর্থিক বাধ্যবাধকতা তৈরি করতে পারে।",
-                "hi": "यदि कुछ गलत होता है तो महत्वपूर्ण वित्तीय दायित्व बन सकता है।",
-                "ta": "விஷயங்கள் தவறாக நடந்தால் கணிசமான நிதி கடமைகளை உருவாக்கும்.",
-                "te": "విషయాలు తప్పుగా జరిగితే గణనీయమైన ఆర్థిక బాధ్యతలు ఏర్పడతాయి."
-            },
-            "general": {
-                "en": "Standard legal language that should still be reviewed carefully.",
-                "bn": "মানক আইনী ভাষা রয়েছে যা সাবধানে পর্যালোচনা করা উচিত।",
-                "hi": "मानक कानूनी भाषा शामिल है जिसकी सावधानीपूर्वक समीक्षा की जानी चाहिए।",
-                "ta": "நிலையான சட்ட மொழி, கவனமாக மதிப்பாய்வு செய்யப்பட வேண்டும்.",
-                "te": "ప్రామాణిక చట్టపరమైన భాష, జాగ్రత్తగా సమీక్షించాలి."
-            }
-        }
-        base = explanations.get(clause_type, explanations["general"]).get(language, explanations["general"]["en"])
-        return f"{risk_level.capitalize()} risk: {base}"
+        return self.rules.explanation(clause_type, risk_level, language)
 
     def _calculate_risk_score(self, clauses: List[Dict[str, Any]]) -> float:
+        risk_values = self.rules.risk_scores
         if not clauses:
-            return 0.3
-        risk_values = {"low": 0.3, "medium": 0.6, "high": 0.9}
-        total = sum(risk_values.get(clause.get("risk_level", "low"), 0.3) for clause in clauses)
+            return risk_values["low"]
+        total = sum(risk_values.get(clause.get("risk_level", "low"), risk_values["low"]) for clause in clauses)
         return min(1.0, total / len(clauses))
 
     def _get_recommended_actions(self, risk_score: float, language: str) -> List[str]:
-        recommendations = {
-            "en": [
-                ["Review the document carefully", "Ensure you understand all obligations", "Clarify ambiguous terms"],
-                ["Consider seeking legal advice", "Negotiate unfavorable terms", "Request clarification on specific clauses"],
-                ["Strongly recommend consulting a lawyer", "Consider significant changes", "Evaluate whether to proceed"]
-            ],
-            "bn": [
-                ["দলিলটি সাবধানে পর্যালোচনা করুন", "সমস্ত দায়িত্ব বোঝা নিশ্চিত করুন", "অস্পষ্ট শর্ত স্পষ্ট করুন"],
-                ["আইনি পরামর্শ নেওয়ার কথা বিবেচনা করুন", "অপ্রিয় শর্ত নিয়ে আলোচনা করুন", "নির্দিষ্ট ধারাগুলি স্পষ্ট করুন"],
-                ["আইনজীবীর পরামর্শ নেওয়া শক্তভাবে সুপারিশ করা হয়", "গুরুত্বপূর্ণ পরিবর্তনের কথা বিবেচনা করুন", "চলতে হবে কিনা মূল্যায়ন করুন"]
-            ]
-        }
-        lang = recommendations.get(language, recommendations["en"])
-        if risk_score < 0.4:
-            return lang[0]
-        elif risk_score < 0.7:
-            return lang[1]
-        else:
-            return lang[2]
+        return list(self.rules.recommendations(risk_score, language))
 
     def _create_plain_language(self, summary: str, language: str) -> str:
-        translations = {
-            "en": f"In simple terms: {summary}",
-            "bn": f"সহজভাবে বললে: {summary}",
-            "hi": f"सरल शब्दों में: {summary}",
-            "ta": f"எளிதான முறையில்: {summary}",
-            "te": f"సరళమైన పదాలలో: {summary}"
-        }
-        return translations.get(language, translations["en"])
+        return self.rules.text("plain_language", language).format(summary=summary)
 
     async def _mock_analysis(self, content: str, language: str) -> Dict[str, Any]:
         summary = await self._get_mock_summary(content, language)
@@ -230,12 +509,8 @@ class AIService:
             "recommended_actions": self._get_recommended_actions(0.3, language)
         }
 
+    def _get_unavailable_summary(self, language: str) -> str:
+        return self.rules.text("unavailable_summary", language)
+
     async def _get_mock_summary(self, content: str, language: str) -> str:
-        texts = {
-            "en": "Mock summary: Legal document could not be analyzed due to missing API key.",
-            "bn": "মক সংক্ষিপ্তসার: API কী অনুপস্থিতির কারণে আইনী দলিল বিশ্লেষণ করা যায়নি।",
-            "hi": "मॉक सारांश: API कुंजी की कमी के कारण कानूनी दस्तावेज़ का विश्लेषण नहीं किया जा सका।",
-            "ta": "மொக் சுருக்கம்: API விசை இல்லை காரணமாக சட்ட ஆவணத்தை பகுப்பாய்வு செய்ய முடியவில்லை.",
-            "te": "మాక్ సారాంశం: API కీ అందుబాటులో లేకపోవడం కారణంగా చట్టపరమైన పత్రాన్ని విశ్లేషించలేము."
-        }
-        return texts.get(language, texts["en"])
+        return self.rules.text("mock_summary", language)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .hf_client import HuggingFaceClient, HuggingFaceError
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-input inference calls that share the same
+    parameters and sends them upstream as one list-input request
+    """
+
+    def __init__(self, client: HuggingFaceClient, max_batch_size: int, max_wait: float):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # The loop only keeps weak references to tasks, so in-flight batches are held here
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    async def query(self, inputs: str, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run one input through the model; returns that input's result object, if any"""
+        if self.max_batch_size <= 1:
+            return self._item(await self.client.query({"inputs": inputs, "parameters": parameters}), 0)
+
+        loop = asyncio.get_running_loop()
+        key = json.dumps(parameters, sort_keys=True)
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((inputs, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: str) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._send(json.loads(key), batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """Cancel waiting and in-flight batches; their callers see CancelledError"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for batch in self._pending.values():
+            for _, future in batch:
+                future.cancel()
+        self._pending.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send(self, parameters: Dict[str, Any], batch: List[Tuple[str, asyncio.Future]]) -> None:
+        live = [(inputs, future) for inputs, future in batch if not future.cancelled()]
+        if not live:
+            return
+        self.batches_sent += 1
+        self.items_sent += len(live)
+        try:
+            result = await self.client.query({"inputs": [inputs for inputs, _ in live], "parameters": parameters})
+            if not isinstance(result, list) or len(result) != len(live):
+                raise HuggingFaceError("Batched response does not match the number of inputs")
+        except asyncio.CancelledError:
+            for _, future in live:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for index, (_, future) in enumerate(live):
+            if not future.done():
+                future.set_result(self._item(result, index))
+
+    @staticmethod
+    def _item(result: Any, index: int) -> Optional[Dict[str, Any]]:
+        if not isinstance(result, list) or len(result) <= index:
+            return None
+        item = result[index]
+        # Some pipelines wrap each input's output in its own list
+        if isinstance(item, list):
+            item = item[0] if item else None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,86 @@
+import re
+import zlib
+from typing import List, Tuple
+
+# A numbered clause ("1.", "2.3", "(a)", "iv)") or an "Article/Section/Clause N" heading at the start of a line
+_CLAUSE_HEADING = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]?|\([a-z0-9]{1,4}\)|[ivx]{1,5}[.)]|(?:article|section|clause)\s+[\w.]+)\s",
+    re.IGNORECASE,
+)
+_BLANK_LINE = re.compile(r"\n\s*\n")
+# About one paragraph in this many may end a section (once the section is half full)
+_SECTION_BOUNDARY_ODDS = 4
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def paragraph_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of paragraphs: blank-line separated blocks, split again before clause headings"""
+    spans: List[Tuple[int, int]] = []
+    position = 0
+    blocks = [(m.start(), m.end()) for m in _BLANK_LINE.finditer(text)] + [(len(text), len(text))]
+    for block_end, next_block in blocks:
+        start = line_start = position
+        for line in text[position:block_end].splitlines(keepends=True):
+            if line_start > start and text[start:line_start].strip() and _CLAUSE_HEADING.match(line.rstrip("\r\n")):
+                spans.append(_strip_span(text, start, line_start))
+                start = line_start
+            line_start += len(line)
+        spans.append(_strip_span(text, start, block_end))
+        position = next_block
+    return [(start, end) for start, end in spans if end > start]
+
+
+def _oversized_spans(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """Cut a paragraph longer than max_chars at whitespace, as close to max_chars as possible"""
+    spans = []
+    while end - start > max_chars:
+        cut = text.rfind(" ", start, start + max_chars)
+        cut = cut if cut > start + max_chars // 2 else start + max_chars
+        spans.append(_strip_span(text, start, cut))
+        start = cut
+    spans.append(_strip_span(text, start, end))
+    return [(s, e) for s, e in spans if e > s]
+
+
+def split_sections(text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Split text into clause-aligned sections of at most max_chars, as (start, end)
+    offsets. Section boundaries are content-defined rather than packed greedily:
+    a section may end after a paragraph whose hash selects it, so an edit only
+    moves the boundaries around it and the unchanged parts of a revised document
+    split into the same sections as before.
+    """
+    sections: List[Tuple[int, int]] = []
+    start = end = None
+    for paragraph_start, paragraph_end in paragraph_spans(text):
+        if paragraph_end - paragraph_start > max_chars:
+            if start is not None:
+                sections.append((start, end))
+                start = None
+            sections.extend(_oversized_spans(text, paragraph_start, paragraph_end, max_chars))
+            continue
+        if start is not None and paragraph_end - start > max_chars:
+            sections.append((start, end))
+            start = None
+        if start is None:
+            start = paragraph_start
+        end = paragraph_end
+        paragraph = text[paragraph_start:paragraph_end].encode("utf-8")
+        if end - start >= max_chars // 2 and zlib.crc32(paragraph) % _SECTION_BOUNDARY_ODDS == 0:
+            sections.append((start, end))
+            start = None
+    if start is not None:
+        sections.append((start, end))
+    return sections
+
+
+def section_texts(text: str, max_chars: int) -> List[str]:
+    """The text of each split_sections section, as summarization chunks"""
+    return [text[start:end] for start, end in split_sections(text, max_chars)]
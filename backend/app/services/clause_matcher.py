@@ -0,0 +1,163 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+# Indic blocks (Devanagari through Sinhala): vowel signs and viramas are combining
+# marks that re's \w does not treat as word characters, so they are listed explicitly.
+_INDIC = "\u0900-\u0DFF"
+_WORD_CHAR = rf"[\w{_INDIC}]"
+# Latin keywords may carry a regular inflection ("fees", "terminated", "warranties"), but no
+# other letters, so "fee" does not match "feet" and "secret" does not match "secretary"
+_LATIN_SUFFIX = r"(?:s|es|d|ed|ing|ies)?"
+_SENTENCE_END = re.compile(r"[.!?।॥]|\n\s*\n")
+# Greedy prefix, so a match ends at the last sentence end
+_LAST_SENTENCE_END = re.compile(rf"(?s:.*)(?:{_SENTENCE_END.pattern})")
+_WHITESPACE = re.compile(r"\s+")
+_MAX_CONTEXT = 300
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    keyword: str
+    start: int
+    end: int
+    sentence: str
+
+
+@dataclass
+class ClauseHits:
+    count: int = 0
+    matches: List[KeywordMatch] = field(default_factory=list)
+
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """Compile keywords into a character-trie regex so each position is tested in one branch walk"""
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Any]) -> str:
+        branches = []
+        for char in sorted(c for c in node if c):
+            # Whitespace inside a keyword matches any run of whitespace in the document
+            head = r"\s+" if char == " " else re.escape(char)
+            branches.append(head + render(node[char]))
+        if not branches:
+            return ""
+        # Longer continuations are tried first; ending here is the fallback
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+class ClauseMatcher:
+    """
+    Finds every clause keyword in a document, with its offsets and sentence.
+
+    The document is lowercased once and each keyword located with str.find, so a
+    keyword absent from the document costs one substring search, the same as the
+    `keyword in text` test this replaced. Each occurrence is then confirmed with a
+    small regex anchored on it: word-boundary checks understand Indic combining
+    marks, Latin keywords must end on a word boundary (after an optional short
+    suffix) and Indic keywords only need to start on one, since case endings
+    attach to the stem. Where two keywords match at the
+    same place the longer one wins. Documents whose lowercase form changes length
+    (so offsets would not line up) fall back to a single trie-shaped regex.
+    Both are built on the first search (or an explicit compile() during warm-up).
+    """
+
+    def __init__(self, patterns: Mapping[str, Sequence[str]], max_evidence: int = 5):
+        self.clause_types: Tuple[str, ...] = tuple(patterns)
+        self.max_evidence = max_evidence
+        self._keywords: Dict[str, Tuple[str, str]] = {}
+        for clause_type, words in patterns.items():
+            for keyword in words:
+                self._keywords[keyword.casefold()] = (clause_type, keyword)
+        self._pattern: Optional[Pattern[str]] = None
+        # (first word, pattern anchored on it, keyword key) over the lowercased text, longest keywords first
+        self._searches: List[Tuple[str, Pattern[str], str]] = []
+
+    def compile(self) -> Pattern[str]:
+        if self._pattern is not None:
+            return self._pattern
+        latin = [k for k in self._keywords if k.isascii()]
+        indic = [k for k in self._keywords if not k.isascii()]
+        alternatives = []
+        if latin:
+            alternatives.append(rf"(?P<latin>{_trie_pattern(latin)}){_LATIN_SUFFIX}(?!{_WORD_CHAR})")
+        if indic:
+            alternatives.append(rf"(?P<indic>{_trie_pattern(indic)})")
+        for key in sorted(self._keywords, key=len, reverse=True):
+            words = key.lower().split(" ")
+            body = rf"(?<!{_WORD_CHAR})" + r"\s+".join(re.escape(word) for word in words)
+            if key.isascii():
+                body += rf"{_LATIN_SUFFIX}(?!{_WORD_CHAR})"
+            self._searches.append((words[0], re.compile(body), key))
+        self._pattern = re.compile(
+            rf"(?<!{_WORD_CHAR})(?:{'|'.join(alternatives)})",
+            re.IGNORECASE,
+        )
+        return self._pattern
+
+    def find(self, text: str) -> Dict[str, ClauseHits]:
+        """Return hits per clause type, in table order; offsets index into text"""
+        hits: Dict[str, ClauseHits] = {}
+        for start, end, key in self._matches(text):
+            clause_type, keyword = self._keywords[key]
+            clause_hits = hits.get(clause_type)
+            if clause_hits is None:
+                clause_hits = hits[clause_type] = ClauseHits()
+            clause_hits.count += 1
+            if len(clause_hits.matches) < self.max_evidence:
+                clause_hits.matches.append(KeywordMatch(
+                    keyword=keyword,
+                    start=start,
+                    end=end,
+                    sentence=self._sentence_around(text, start, end),
+                ))
+        return {clause_type: hits[clause_type] for clause_type in self.clause_types if clause_type in hits}
+
+    def _matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, keyword key) of every non-overlapping keyword match, in document order"""
+        pattern = self.compile()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return [(match.start(), match.end(), _WHITESPACE.sub(" ", match.group(match.lastgroup)).casefold())
+                    for match in pattern.finditer(text)]
+
+        candidates = []
+        find = lowered.find
+        for rank, (head, search, key) in enumerate(self._searches):
+            match_at = search.match
+            position = find(head)
+            while position != -1:
+                match = match_at(lowered, position)
+                if match is not None:
+                    candidates.append((position, rank, match.end(), key))
+                position = find(head, position + 1)
+        candidates.sort()
+
+        matches = []
+        last_end = 0
+        for start, _, end, key in candidates:
+            # At one position the longest keyword (lowest rank) wins; later ones may not overlap it
+            if start >= last_end:
+                matches.append((start, end, key))
+                last_end = end
+        return matches
+
+    @staticmethod
+    def _sentence_around(text: str, start: int, end: int) -> str:
+        window_start = max(0, start - _MAX_CONTEXT)
+        boundary = _LAST_SENTENCE_END.match(text, window_start, start)
+        sentence_start = boundary.end() if boundary else window_start
+
+        window_end = min(len(text), end + _MAX_CONTEXT)
+        boundary = _SENTENCE_END.search(text, end, window_end)
+        sentence_end = boundary.end() if boundary else window_end
+
+        return " ".join(text[sentence_start:sentence_end].split())
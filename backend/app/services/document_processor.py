@@ -1,46 +1,102 @@
 import os
-import tempfile
+import asyncio
 from typing import Optional
-import PyPDF2
-import docx
 from fastapi import UploadFile, HTTPException
 import logging
-import io
+
+from ..config import Settings, get_settings
+from .extraction import (
+    ExtractionError, ExtractionPool, ExtractionResult, Segment, Source, extract_docx, extract_pdf_pages,
+)
+from .metrics import DOCUMENT_BYTES, timed
+from .uploads import SpooledUpload, read_source, spool_upload
 
 logger = logging.getLogger(__name__)
 
 class DocumentProcessor:
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.pool = ExtractionPool(
+            workers=self.settings.extraction_workers,
+            memory_limit_mb=self.settings.extraction_memory_limit_mb,
+            preload=self.settings.warmup,
+        )
+
+    async def warm_up(self) -> None:
+        await self.pool.warm_up()
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
     async def process_uploaded_file(self, file: UploadFile) -> str:
         """
         Process uploaded file and extract text content with proper format handling
         """
-        content_type = file.content_type
-        filename = file.filename.lower()
-        
+        return (await self.extract(file)).text
+
+    async def extract(self, file: UploadFile, max_pages: Optional[int] = None,
+                      max_chars: Optional[int] = None) -> ExtractionResult:
+        """
+        Extract an upload into structured segments, stopping early once the
+        page or character budget is spent
+        """
+        upload = await self.spool(file)
+        try:
+            return await self.extract_source(upload.source, file.filename, file.content_type, max_pages, max_chars)
+        finally:
+            upload.close()
+
+    async def spool(self, file: UploadFile) -> SpooledUpload:
+        """Validate an upload and stream it into a spooled file, refusing it once it exceeds the size limit"""
         # Validate file type
-        if not self._is_supported_file_type(content_type, filename):
+        if not self._is_supported_file_type(file.content_type, file.filename.lower()):
             raise HTTPException(
                 status_code=400, 
                 detail="Unsupported file type. Please upload PDF, Word, or text files."
             )
-        
+
+        with timed("upload_read"):
+            upload = await spool_upload(
+                file,
+                max_size=self.settings.max_file_size,
+                chunk_size=self.settings.upload_chunk_size,
+                memory_threshold=self.settings.upload_spool_threshold,
+            )
+        extension = os.path.splitext(file.filename.lower())[1].lstrip(".")
+        DOCUMENT_BYTES.observe(upload.size, type=extension if extension in self.settings.allowed_file_types else "other")
+        return upload
+
+    async def extract_source(self, source: Source, filename: str, content_type: Optional[str],
+                             max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> ExtractionResult:
+        """Extract already-received document bytes or a stored file, dispatching on its type"""
+        filename = filename.lower()
+        # The whole document shares one time budget, however many worker tasks it is split into
+        deadline = asyncio.get_running_loop().time() + self.settings.extraction_timeout
         try:
-            # Read file content
-            file_content = await file.read()
-            
             # Process based on file type
             if filename.endswith('.pdf'):
-                return self._extract_text_from_pdf(file_content)
+                with timed("extract_pdf"):
+                    return await self._extract_text_from_pdf(source, deadline, max_pages, max_chars)
             elif filename.endswith(('.doc', '.docx')):
-                return self._extract_text_from_docx(file_content)
+                with timed("extract_docx"):
+                    return await self._extract_text_from_docx(source, deadline, max_chars)
             elif filename.endswith('.txt') or 'text' in (content_type or ''):
-                return file_content.decode('utf-8')
+                with timed("extract_text"):
+                    text = read_source(source).decode('utf-8')
+                truncated = max_chars is not None and len(text) > max_chars
+                return ExtractionResult(segments=[Segment(text=text[:max_chars] if truncated else text)],
+                                        truncated=truncated)
             else:
                 raise HTTPException(
                     status_code=400, 
                     detail="Unsupported file type. Please upload PDF, Word, or text files."
                 )
-                
+
+        except HTTPException:
+            raise
+        except ExtractionError as e:
+            logger.error(f"Document extraction failed: {str(e)}")
+            raise HTTPException(status_code=422, detail=f"Failed to process document: {str(e)}")
         except Exception as e:
             logger.error(f"Document processing error: {str(e)}")
             raise HTTPException(
@@ -61,24 +117,58 @@ class DocumentProcessor:
         return (any(filename.endswith(ext) for ext in supported_extensions) or
                 any(ct in (content_type or '') for ct in supported_content_types))
     
-    def _extract_text_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF using PyPDF2"""
+    async def _run(self, deadline: float, fn, *args):
+        """Run one extraction task in the pool within what is left of the document's time budget"""
+        return await self.pool.run(fn, *args, timeout=max(0.0, deadline - asyncio.get_running_loop().time()))
+
+    async def _extract_text_from_pdf(self, source: Source, deadline: float, max_pages: Optional[int] = None,
+                                     max_chars: Optional[int] = None) -> ExtractionResult:
+        """Extract text from PDF using PyPDF2, fanning large documents out across workers by page range"""
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            step = self.settings.pdf_pages_per_task
+            first = await self._run(deadline, extract_pdf_pages, source, 0, self._stop(step, max_pages), max_chars)
+            page_count = first.page_count
+            last_page = self._stop(page_count, max_pages)
+            if first.truncated or last_page <= step:
+                first.truncated = first.truncated or last_page < page_count
+                return first
+
+            ranges = [(start, min(start + step, last_page)) for start in range(step, last_page, step)]
+            if max_chars is None:
+                rest = await asyncio.gather(*(
+                    self._run(deadline, extract_pdf_pages, source, start, stop) for start, stop in ranges
+                ))
+            else:
+                # A character budget is usually spent within a few ranges, so walk them in order
+                rest = []
+                remaining = max_chars - len(first.text) - 1
+                for start, stop in ranges:
+                    part = await self._run(deadline, extract_pdf_pages, source, start, stop, remaining)
+                    rest.append(part)
+                    remaining -= len(part.text) + 1
+                    if part.truncated or remaining <= 0:
+                        break
+
+            result = ExtractionResult(segments=first.segments, page_count=page_count)
+            for part in rest:
+                result.segments.extend(part.segments)
+            result.truncated = any(part.truncated for part in rest) or result.segments[-1].page < page_count
+            return result
+        except ExtractionError:
+            raise
         except Exception as e:
             raise Exception(f"PDF extraction failed: {str(e)}")
-    
-    def _extract_text_from_docx(self, file_content: bytes) -> str:
-        """Extract text from Word document using python-docx"""
+
+    @staticmethod
+    def _stop(limit: int, max_pages: Optional[int]) -> int:
+        return limit if max_pages is None else min(limit, max_pages)
+
+    async def _extract_text_from_docx(self, source: Source, deadline: float,
+                                      max_chars: Optional[int] = None) -> ExtractionResult:
+        """Extract paragraphs and table cells from Word document using python-docx"""
         try:
-            doc = docx.Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return await self._run(deadline, extract_docx, source, max_chars)
+        except ExtractionError:
+            raise
         except Exception as e:
-            raise Exception(f"Word document extraction failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Word document extraction failed: {str(e)}")
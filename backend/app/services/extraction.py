@@ -0,0 +1,270 @@
+import asyncio
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be extracted (crash, memory cap, malformed file)"""
+
+
+def _init_worker(memory_limit_mb: int, preload: bool = False) -> None:
+    """Cap the address space of an extraction worker so a hostile file cannot exhaust the host"""
+    if memory_limit_mb > 0:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not apply extraction memory limit: {str(e)}")
+    if preload:
+        preload_parsers()
+
+
+def preload_parsers() -> None:
+    """Import the document parsers ahead of the first document (they are otherwise loaded on first use)"""
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+
+
+Source = Union[str, bytes]
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[BinaryIO]:
+    """Open extractor input: in-memory bytes, or a spooled file mapped read-only into memory"""
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield io.BytesIO(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+@dataclass
+class Segment:
+    """A run of extracted text with its position in the source document"""
+    text: str
+    page: Optional[int] = None
+    heading: Optional[str] = None
+    table: Optional[int] = None
+    row: Optional[int] = None
+    cell: Optional[int] = None
+
+
+@dataclass
+class ExtractionResult:
+    segments: List[Segment] = field(default_factory=list)
+    page_count: Optional[int] = None
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        return "\n".join(segment.text for segment in self.segments)
+
+
+def take_within_budget(segments: Iterable[Segment], max_chars: Optional[int]) -> Tuple[List[Segment], bool]:
+    """Consume segments lazily until max_chars is reached; returns them and whether input was left over"""
+    taken: List[Segment] = []
+    remaining = max_chars
+    for segment in segments:
+        if remaining is not None and len(segment.text) >= remaining:
+            if remaining:
+                segment.text = segment.text[:remaining]
+                taken.append(segment)
+            return taken, True
+        taken.append(segment)
+        if remaining is not None:
+            remaining -= len(segment.text) + 1
+    return taken, False
+
+
+def iter_pdf_segments(pdf_reader: Any, start: int, stop: int) -> Iterator[Segment]:
+    for index in range(start, stop):
+        yield Segment(text=pdf_reader.pages[index].extract_text() or "", page=index + 1)
+
+
+def docx_heading_style_ids(doc: Any) -> Set[str]:
+    """
+    Ids of the paragraph styles named Heading* or Title*, read once from the
+    styles part: resolving paragraph.style scans every style on each call
+    """
+    from docx.enum.style import WD_STYLE_TYPE
+
+    ids = set()
+    for style in doc.styles.element.style_lst:
+        # Built-in names are stored lowercase ("heading 1") in styles.xml
+        name = (style.name_val or "").lower()
+        if style.type == WD_STYLE_TYPE.PARAGRAPH and name.startswith(("heading", "title")):
+            ids.add(style.styleId)
+    return ids
+
+
+def iter_docx_segments(doc: Any) -> Iterator[Segment]:
+    """Walk the document body in order, yielding paragraphs and table cells under their nearest heading"""
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    heading_styles = docx_heading_style_ids(doc)
+    heading = None
+    table_index = 0
+    for element in doc.element.body.iterchildren():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            paragraph = Paragraph(element, doc)
+            # The paragraph's own pStyle id; paragraphs without one use the default (body text) style
+            if element.style in heading_styles and paragraph.text.strip():
+                heading = paragraph.text.strip()
+            yield Segment(text=paragraph.text, heading=heading)
+        elif tag == "tbl":
+            table = Table(element, doc)
+            for row_index, row in enumerate(table.rows):
+                seen = set()
+                for cell_index, cell in enumerate(row.cells):
+                    # Merged cells are returned once per grid column they span
+                    if id(cell._tc) in seen:
+                        continue
+                    seen.add(id(cell._tc))
+                    yield Segment(text=cell.text, heading=heading, table=table_index,
+                                  row=row_index, cell=cell_index)
+            table_index += 1
+
+
+def extract_pdf_pages(source: Source, start: int = 0, stop: Optional[int] = None,
+                      max_chars: Optional[int] = None) -> ExtractionResult:
+    """Extract pages [start, stop) of a PDF, stopping early once max_chars have been collected"""
+    import PyPDF2
+
+    with open_source(source) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        page_count = len(pdf_reader.pages)
+        stop = page_count if stop is None else min(stop, page_count)
+        segments, truncated = take_within_budget(iter_pdf_segments(pdf_reader, start, stop), max_chars)
+    return ExtractionResult(segments=segments, page_count=page_count, truncated=truncated)
+
+
+def extract_docx(source: Source, max_chars: Optional[int] = None) -> ExtractionResult:
+    import docx
+
+    # python-docx reads the zip container through its own buffered file handle
+    doc = docx.Document(source if isinstance(source, str) else io.BytesIO(source))
+    segments, truncated = take_within_budget(iter_docx_segments(doc), max_chars)
+    return ExtractionResult(segments=segments, truncated=truncated)
+
+
+class ExtractionPool:
+    """
+    Runs CPU-bound extraction in a pool of worker processes so parsing never
+    blocks the event loop and a crashing parser only takes down its worker
+    """
+
+    def __init__(self, workers: int, memory_limit_mb: int = 0, preload: bool = False):
+        self.workers = workers
+        self.memory_limit_mb = memory_limit_mb
+        # Load the parsers when a worker starts rather than on its first document
+        self.preload = preload
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Tasks still awaited per executor, and retired executors to kill once they have none
+        self._active: Dict[ProcessPoolExecutor, int] = {}
+        self._retired: Set[ProcessPoolExecutor] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._new_executor(self.workers)
+        return self._executor
+
+    def _new_executor(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb, self.preload),
+        )
+
+    async def warm_up(self) -> None:
+        """Start the workers ahead of the first documents (with preload, they also load the parsers)"""
+        await asyncio.gather(*(self.run(preload_parsers) for _ in range(max(1, self.workers))))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run fn(*args) in a worker, raising ExtractionError if it crashes, runs out of memory or times out"""
+        if self.workers <= 0:
+            # Pool disabled: still keep the parse off the event loop (a stuck thread cannot be killed)
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout)
+            except asyncio.TimeoutError:
+                raise ExtractionError("Document took too long to process")
+
+        deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+        executor = self._get_executor()
+        try:
+            return await self._submit(executor, fn, args, timeout)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None
+                self._terminate(executor)
+        except MemoryError:
+            raise ExtractionError("Document exceeds the extraction memory limit")
+
+        # A broken pool fails every task on it, not just the one whose document killed a
+        # worker: retry alone in a fresh process, so only that document fails again
+        logger.warning("Extraction worker crashed, retrying the document in an isolated worker")
+        isolated = self._new_executor(1)
+        try:
+            remaining = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+            return await self._submit(isolated, fn, args, remaining)
+        except BrokenProcessPool:
+            raise ExtractionError("Document extraction worker crashed")
+        except MemoryError:
+            raise ExtractionError("Document exceeds the extraction memory limit")
+        finally:
+            self._terminate(isolated)
+
+    async def _submit(self, executor: ProcessPoolExecutor, fn: Callable[..., Any], args: Tuple[Any, ...],
+                      timeout: Optional[float]) -> Any:
+        future = executor.submit(fn, *args)
+        self._active[executor] = self._active.get(executor, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # A worker is stuck on this document. Other documents on the pool keep running;
+            # new work goes to a fresh pool and this one is killed once they are done.
+            self._retire(executor)
+            raise ExtractionError("Document took too long to process")
+        finally:
+            self._active[executor] -= 1
+            if not self._active[executor]:
+                del self._active[executor]
+                if executor in self._retired:
+                    self._retired.discard(executor)
+                    self._terminate(executor)
+
+    def _retire(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+        self._retired.add(executor)
+
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor) -> None:
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for executor in list(self._retired):
+            self._terminate(executor)
+        self._retired.clear()
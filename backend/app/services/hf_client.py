@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ..config import Settings, get_settings
+from .metrics import (
+    UPSTREAM_CIRCUIT_OPEN, UPSTREAM_CONCURRENCY_LIMIT, UPSTREAM_REJECTED, UPSTREAM_RESPONSES, UPSTREAM_RETRIES, timed,
+)
+from .resilience import HALF_OPEN, OPEN, AdaptiveLimiter, CircuitBreaker
+
+if TYPE_CHECKING:
+    # httpx is imported on first use: it is a large share of the app's import time
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class HuggingFaceError(Exception):
+    """Raised when the inference API cannot produce a usable response"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(HuggingFaceError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class HuggingFaceClient:
+    """
+    Async Hugging Face inference client with a shared keep-alive connection pool,
+    bounded retries, a circuit breaker and an adaptive cap on in-flight upstream calls
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.api_key = self.settings.huggingface_api_key
+        self.model = self.settings.summarization_model
+        self.api_url = f"{self.settings.huggingface_api_url.rstrip('/')}/{self.model}"
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.settings.hf_breaker_failures,
+            slow_call_seconds=self.settings.hf_slow_call_seconds,
+            open_seconds=self.settings.hf_breaker_open_seconds,
+            half_open_calls=self.settings.hf_breaker_half_open_calls,
+        )
+        self.limiter = AdaptiveLimiter(
+            initial=self.settings.hf_max_concurrency,
+            min_limit=self.settings.hf_min_concurrency,
+            max_limit=self.settings.hf_max_concurrency,
+            latency_target=self.settings.hf_latency_target,
+        )
+        self._client: Optional["httpx.AsyncClient"] = None
+        # The httpx module, imported by the first _get_client call
+        self._httpx: Any = None
+        UPSTREAM_CIRCUIT_OPEN.set_function(lambda: {OPEN: 1.0, HALF_OPEN: 0.5}.get(self.breaker.state, 0.0))
+        UPSTREAM_CONCURRENCY_LIMIT.set_function(lambda: self.limiter.limit)
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._httpx is None:
+            import httpx
+            self._httpx = httpx
+
+        httpx = self._httpx
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.settings.hf_max_connections,
+                max_keepalive_connections=self.settings.hf_max_connections,
+            )
+            timeout = httpx.Timeout(self.settings.hf_timeout, connect=self.settings.hf_connect_timeout)
+            self._client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=limits,
+                timeout=timeout,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def warm_up(self, connections: int) -> None:
+        """Open keep-alive connections to the inference endpoint before the first request needs them"""
+        client = self._get_client()
+
+        async def connect() -> Optional[Exception]:
+            try:
+                # Any response leaves an open connection in the pool; it is not a health check
+                await client.head(self.api_url, timeout=self.settings.hf_connect_timeout)
+            except self._httpx.HTTPError as e:
+                return e
+            return None
+
+        count = max(1, min(connections, self.settings.hf_max_connections))
+        errors = [e for e in await asyncio.gather(*(connect() for _ in range(count))) if e is not None]
+        if errors:
+            logger.warning(f"Hugging Face warm-up: {len(errors)} of {count} connections failed: {str(errors[0])}")
+
+    async def query(self, payload: Dict[str, Any]) -> Any:
+        """POST a payload to the model endpoint, retrying transient failures"""
+        # Opens the client first, so the httpx errors caught below are available
+        self._get_client()
+        max_retries = self.settings.hf_max_retries
+        for attempt in range(max_retries + 1):
+            # Checked before every attempt, so retries stop as soon as the circuit opens
+            if not self.breaker.allow():
+                UPSTREAM_REJECTED.inc()
+                raise CircuitOpenError("Hugging Face API unavailable, circuit open")
+            try:
+                response, latency = await self._post(payload)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except self._httpx.HTTPError as e:
+                self.breaker.record_failure()
+                UPSTREAM_RESPONSES.inc(status="error")
+                if attempt >= max_retries:
+                    raise HuggingFaceError(f"Request failed: {str(e)}") from e
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Hugging Face request error ({str(e)}), retrying in {delay:.1f}s")
+                UPSTREAM_RETRIES.inc(status="error")
+                with timed("upstream_retry_wait"):
+                    await asyncio.sleep(delay)
+                continue
+
+            UPSTREAM_RESPONSES.inc(status=str(response.status_code))
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self.breaker.record_failure()
+            else:
+                # Other client errors are about the request, not upstream health
+                self.breaker.record_success(latency)
+
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except ValueError as e:
+                    # A 200 with a body that is not JSON is as unusable as an error response
+                    raise HuggingFaceError(f"Invalid response body: {str(e)}", status_code=200) from e
+
+            error = self._error_body(response)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                raise HuggingFaceError(
+                    f"Hugging Face API error: {error.get('error', 'Unknown error')}",
+                    status_code=response.status_code,
+                )
+
+            delay = self._backoff_delay(attempt, error.get("estimated_time"))
+            logger.info(f"Hugging Face returned {response.status_code}, retrying in {delay:.1f}s")
+            UPSTREAM_RETRIES.inc(status=str(response.status_code))
+            with timed("upstream_retry_wait"):
+                await asyncio.sleep(delay)
+
+        raise HuggingFaceError("Retries exhausted")
+
+    async def _post(self, payload: Dict[str, Any]) -> Tuple["httpx.Response", float]:
+        """One upstream call under the adaptive concurrency limit, fed back with its latency"""
+        await self.limiter.acquire()
+        start = time.monotonic()
+        latency: Optional[float] = None
+        overloaded = False
+        try:
+            with timed("upstream_request"):
+                response = await self._get_client().post(self.api_url, json=payload)
+            latency = time.monotonic() - start
+            overloaded = response.status_code in THROTTLE_STATUS_CODES
+            return response, latency
+        except self._httpx.TimeoutException:
+            overloaded = True
+            raise
+        finally:
+            self.limiter.release(latency, overloaded)
+
+    def _backoff_delay(self, attempt: int, estimated_time: Any = None) -> float:
+        """Jittered exponential backoff, stretched to the model's estimated load time"""
+        ceiling = min(self.settings.hf_backoff_max, self.settings.hf_backoff_base * (2 ** attempt))
+        delay = random.uniform(ceiling / 2, ceiling)
+        try:
+            if estimated_time is not None:
+                delay = max(delay, min(float(estimated_time), self.settings.hf_backoff_max))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    @staticmethod
+    def _error_body(response: "httpx.Response") -> Dict[str, Any]:
+        try:
+            body = response.json()
+            return body if isinstance(body, dict) else {}
+        except ValueError:
+            return {"error": response.text[:200]}
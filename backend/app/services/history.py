@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from ..models import DocumentHistory, User
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop(): the writer flushes what it has collected and exits
+_STOP = object()
+
+# Columns returned by history listings unless the full analysis is asked for
+SUMMARY_COLUMNS = (
+    DocumentHistory.id,
+    DocumentHistory.filename,
+    DocumentHistory.content_hash,
+    DocumentHistory.language,
+    DocumentHistory.summary,
+    DocumentHistory.risk_score,
+    DocumentHistory.analyzed_at,
+)
+
+
+def encode_cursor(analyzed_at: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{analyzed_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    analyzed_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(analyzed_at), int(row_id)
+
+
+class HistoryWriter:
+    """
+    Persists analysis history off the request path: records are queued in
+    memory and written in batches by a background task
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int = 100,
+                 flush_interval: float = 0.5, max_pending: int = 10000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            if not self._task.done():
+                await self._queue.put(_STOP)
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Write anything recorded after the writer took its last batch
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await asyncio.to_thread(self._write, batch)
+
+    def record(self, user_id: int, filename: Optional[str], content_hash: str,
+               language: str, analysis: Dict[str, Any]) -> None:
+        """Queue a history row; never waits on the database"""
+        try:
+            self._queue.put_nowait({
+                "user_id": user_id,
+                "filename": filename,
+                "content_hash": content_hash,
+                "language": language,
+                "summary": analysis.get("summary"),
+                "analysis_result": analysis,
+                "risk_score": analysis.get("risk_score"),
+                "analyzed_at": datetime.utcnow(),
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("History queue full, dropping record")
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            record = await self._queue.get()
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while True:
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+                timeout = deadline - asyncio.get_running_loop().time()
+                if len(batch) >= self.batch_size or timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write, batch)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} history records: {str(e)}")
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self._write_batch(batch)
+        except IntegrityError:
+            # Another process created one of the same users first; its row now exists
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        # The same document analyzed again by the same user refreshes its row instead of adding one
+        latest: Dict[Tuple[int, str, str], Dict[str, Any]] = {}
+        for row in batch:
+            latest[(row["user_id"], row["content_hash"], row["language"])] = row
+
+        with self.session_factory() as session:
+            # Users are authenticated by token, so a user's first record also creates their row
+            user_ids = {row["user_id"] for row in batch}
+            known = set(session.scalars(select(User.id).where(User.id.in_(user_ids))))
+            if user_ids - known:
+                session.add_all(User(id=user_id) for user_id in user_ids - known)
+                session.flush()
+
+            existing = session.execute(
+                select(DocumentHistory.id, DocumentHistory.user_id, DocumentHistory.content_hash,
+                       DocumentHistory.language)
+                .where(tuple_(DocumentHistory.user_id, DocumentHistory.content_hash).in_(
+                    list({(user_id, content_hash) for user_id, content_hash, _ in latest})
+                ))
+            ).all()
+            existing_ids = {(r.user_id, r.content_hash, r.language): r.id for r in existing}
+
+            updates = [dict(row, id=existing_ids[key]) for key, row in latest.items() if key in existing_ids]
+            inserts = [row for key, row in latest.items() if key not in existing_ids]
+            if updates:
+                session.execute(update(DocumentHistory), updates)
+            if inserts:
+                session.add_all(DocumentHistory(**row) for row in inserts)
+            session.commit()
+
+    async def list_for_user(self, user_id: int, limit: int, cursor: Optional[str] = None,
+                            full: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await asyncio.to_thread(self._list_for_user, user_id, limit, cursor, full)
+
+    def _list_for_user(self, user_id: int, limit: int, cursor: Optional[str],
+                       full: bool) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        columns = SUMMARY_COLUMNS + ((DocumentHistory.analysis_result,) if full else ())
+        query = select(*columns).where(DocumentHistory.user_id == user_id)
+        if cursor:
+            # Keyset pagination: continue strictly after the last row of the previous page
+            analyzed_at, row_id = decode_cursor(cursor)
+            query = query.where(or_(
+                DocumentHistory.analyzed_at < analyzed_at,
+                and_(DocumentHistory.analyzed_at == analyzed_at, DocumentHistory.id < row_id),
+            ))
+        query = query.order_by(DocumentHistory.analyzed_at.desc(), DocumentHistory.id.desc()).limit(limit + 1)
+
+        with self.session_factory() as session:
+            rows = [dict(row._mapping) for row in session.execute(query)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["analyzed_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def get_for_user(self, user_id: int, history_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get_for_user, user_id, history_id)
+
+    def _get_for_user(self, user_id: int, history_id: int) -> Optional[Dict[str, Any]]:
+        query = select(*SUMMARY_COLUMNS, DocumentHistory.analysis_result).where(
+            DocumentHistory.id == history_id, DocumentHistory.user_id == user_id
+        )
+        with self.session_factory() as session:
+            row = session.execute(query).first()
+        return dict(row._mapping) if row is not None else None
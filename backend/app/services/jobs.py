@@ -0,0 +1,392 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity and the caller should retry later"""
+
+
+@dataclass
+class Job:
+    client_id: str
+    language: str
+    mode: str = "full"
+    priority: int = 0
+    text: Optional[str] = None
+    file_path: Optional[str] = None
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # The process running the job, and when its claim lapses unless renewed
+    worker_id: Optional[str] = None
+    lease_expires: Optional[float] = None
+
+
+class MemoryJobStore:
+    """In-process job store; jobs are lost when the worker process exits"""
+
+    def __init__(self, lease_seconds: float = 60.0):
+        self.lease_seconds = lease_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._queue: List[Any] = []
+        self._order = itertools.count()
+        self._running: Dict[str, int] = {}
+        self._queued = 0
+
+    async def add(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        heapq.heappush(self._queue, (-job.priority, next(self._order), job.id))
+        self._queued += 1
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def queued_count(self) -> int:
+        return self._queued
+
+    async def claim_next(self, per_client_limit: int) -> Optional[Job]:
+        deferred = []
+        claimed = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            job = self._jobs.get(entry[2])
+            if job is None or job.status != QUEUED:
+                continue
+            if self._running.get(job.client_id, 0) >= per_client_limit:
+                deferred.append(entry)
+                continue
+            claimed = job
+            break
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+
+        if claimed is not None:
+            claimed.status = RUNNING
+            claimed.started_at = time.time()
+            self._running[claimed.client_id] = self._running.get(claimed.client_id, 0) + 1
+            self._queued -= 1
+        return claimed
+
+    async def finish(self, job: Job) -> None:
+        remaining = self._running.get(job.client_id, 1) - 1
+        if remaining > 0:
+            self._running[job.client_id] = remaining
+        else:
+            self._running.pop(job.client_id, None)
+
+    async def renew(self, job_ids: List[str]) -> None:
+        pass
+
+    async def requeue_expired(self) -> int:
+        return 0
+
+    async def purge_finished(self, older_than: float) -> List[Job]:
+        expired = [job for job in self._jobs.values()
+                   if job.status in (DONE, FAILED) and (job.finished_at or 0) < older_than]
+        for job in expired:
+            del self._jobs[job.id]
+        return expired
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteJobStore:
+    """
+    Job store backed by a local sqlite file, so queued jobs survive worker restarts.
+    Several processes may share the file: a job is claimed with a compare-and-swap
+    on its status and held under a lease that its process keeps renewing, and only
+    jobs whose lease has lapsed (their process died) are returned to the queue.
+    """
+
+    _COLUMNS = ("id", "client_id", "language", "mode", "priority", "text", "file_path", "filename",
+                "content_type", "status", "result", "error", "created_at", "started_at", "finished_at",
+                "worker_id", "lease_expires")
+    _CLAIM_ATTEMPTS = 5
+
+    def __init__(self, db_path: str, lease_seconds: float = 60.0):
+        self.lease_seconds = lease_seconds
+        self.worker_id = uuid.uuid4().hex
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, client_id TEXT NOT NULL, language TEXT NOT NULL, mode TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, text TEXT, file_path TEXT, filename TEXT, content_type TEXT, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, worker_id TEXT, lease_expires REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("worker_id", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_status_priority ON jobs (status, priority DESC, created_at)"
+        )
+        self._db.commit()
+
+    def _row_to_job(self, row: Any) -> Job:
+        values = dict(zip(self._COLUMNS, row))
+        values["result"] = json.loads(values["result"]) if values["result"] else None
+        return Job(**values)
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[Any]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+        return rows
+
+    async def add(self, job: Job) -> None:
+        values = asdict(job)
+        values["result"] = json.dumps(job.result) if job.result is not None else None
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        await asyncio.to_thread(
+            self._execute,
+            f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+            tuple(values[column] for column in self._COLUMNS),
+        )
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        rows = await asyncio.to_thread(
+            self._execute, f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        )
+        return self._row_to_job(rows[0]) if rows else None
+
+    async def queued_count(self) -> int:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,))
+        return rows[0][0]
+
+    def _claim(self, per_client_limit: int) -> Optional[Job]:
+        with self._lock:
+            for _ in range(self._CLAIM_ATTEMPTS):
+                row = self._db.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status = ? AND client_id NOT IN ("
+                    "SELECT client_id FROM jobs WHERE status = ? GROUP BY client_id HAVING COUNT(*) >= ?) "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (QUEUED, RUNNING, per_client_limit),
+                ).fetchone()
+                if row is None:
+                    return None
+                job = self._row_to_job(row)
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.worker_id = self.worker_id
+                job.lease_expires = job.started_at + self.lease_seconds
+                # Only succeeds if no other process claimed the job since the SELECT
+                cursor = self._db.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, worker_id = ?, lease_expires = ? "
+                    "WHERE id = ? AND status = ?",
+                    (job.status, job.started_at, job.worker_id, job.lease_expires, job.id, QUEUED),
+                )
+                self._db.commit()
+                if cursor.rowcount == 1:
+                    return job
+        return None
+
+    async def claim_next(self, per_client_limit: int) -> Optional[Job]:
+        return await asyncio.to_thread(self._claim, per_client_limit)
+
+    async def finish(self, job: Job) -> None:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, text = NULL, lease_expires = NULL "
+            "WHERE id = ? AND status = ? AND worker_id = ? RETURNING id",
+            (job.status, json.dumps(job.result) if job.result is not None else None,
+             job.error, job.finished_at, job.id, RUNNING, self.worker_id),
+        )
+        if not rows:
+            logger.warning(f"Job {job.id} lost its lease before finishing; its result was discarded")
+
+    async def renew(self, job_ids: List[str]) -> None:
+        """Extend the leases of jobs this process is still running"""
+        if not job_ids:
+            return
+        await asyncio.to_thread(
+            self._execute,
+            f"UPDATE jobs SET lease_expires = ? WHERE status = ? AND worker_id = ? "
+            f"AND id IN ({', '.join('?' for _ in job_ids)})",
+            (time.time() + self.lease_seconds, RUNNING, self.worker_id, *job_ids),
+        )
+
+    async def requeue_expired(self) -> int:
+        """Return running jobs whose lease lapsed (their process crashed or was killed) to the queue"""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = ?, started_at = NULL, worker_id = NULL, lease_expires = NULL "
+            "WHERE status = ? AND (lease_expires IS NULL OR lease_expires < ?) RETURNING id",
+            (QUEUED, RUNNING, time.time()),
+        )
+        return len(rows)
+
+    async def purge_finished(self, older_than: float) -> List[Job]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            f"DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ? RETURNING {', '.join(self._COLUMNS)}",
+            (DONE, FAILED, older_than),
+        )
+        return [self._row_to_job(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def create_job_store(backend: str, db_path: str, lease_seconds: float = 60.0) -> Any:
+    if backend == "sqlite":
+        return SqliteJobStore(db_path, lease_seconds)
+    if backend == "memory":
+        return MemoryJobStore(lease_seconds)
+    raise ValueError(f"Unknown job backend: {backend}")
+
+
+class JobQueue:
+    """
+    Bounded priority queue of analysis jobs drained by a pool of background
+    workers, with a cap on how many jobs one client can have running at once
+    """
+
+    def __init__(self, store: Any, handler: Callable[[Job], Awaitable[Dict[str, Any]]],
+                 workers: int, max_queued: int, per_client_limit: int, result_ttl: float):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.per_client_limit = per_client_limit
+        self.result_ttl = result_ttl
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[str] = set()
+
+    async def start(self) -> None:
+        await self._requeue_expired()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._renew_leases()))
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def is_full(self) -> bool:
+        return await self.store.queued_count() >= self.max_queued
+
+    async def submit(self, job: Job) -> Job:
+        if await self.is_full():
+            raise QueueFullError("Job queue is full")
+        await self.store.add(job)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        last_purge = 0.0
+        last_requeue = time.time()
+        while True:
+            try:
+                # Clear before claiming so a submit that lands mid-claim still wakes us
+                self._wakeup.clear()
+                job = await self.store.claim_next(self.per_client_limit)
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+                    if time.time() - last_purge > 60:
+                        last_purge = time.time()
+                        await self._purge()
+                    if time.time() - last_requeue > self.store.lease_seconds / 2:
+                        last_requeue = time.time()
+                        await self._requeue_expired()
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A store error must not end the worker; back off and try again
+                logger.error(f"Job worker error: {str(e)}")
+                await asyncio.sleep(1.0)
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await self.store.renew(list(self._running))
+            except Exception as e:
+                logger.error(f"Could not renew job leases: {str(e)}")
+
+    async def _requeue_expired(self) -> None:
+        requeued = await self.store.requeue_expired()
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs whose worker stopped renewing their lease")
+
+    async def _run(self, job: Job) -> None:
+        self._running.add(job.id)
+        try:
+            await self._execute(job)
+        finally:
+            self._running.discard(job.id)
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            job.result = await self.handler(job)
+            job.status = DONE
+        except asyncio.CancelledError:
+            # Shutting down: leave the job marked running; it is requeued once its lease lapses
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.error = str(getattr(e, "detail", None) or e)
+            job.status = FAILED
+        job.finished_at = time.time()
+        try:
+            await self.store.finish(job)
+        except Exception as e:
+            # Without renewals the lease lapses and the job is requeued and run again
+            logger.error(f"Could not record the outcome of job {job.id}: {str(e)}")
+            return
+        self._discard_file(job)
+        # A slot freed up for this client; let idle workers look again
+        self._wakeup.set()
+
+    async def _purge(self) -> None:
+        for job in await self.store.purge_finished(time.time() - self.result_ttl):
+            self._discard_file(job)
+
+    @staticmethod
+    def _discard_file(job: Job) -> None:
+        if job.file_path:
+            try:
+                os.unlink(job.file_path)
+            except FileNotFoundError:
+                pass
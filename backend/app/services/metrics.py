@@ -0,0 +1,236 @@
+import abc
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Stage durations recorded during the current request, read back for the Server-Timing header.
+# Concurrent stages (e.g. chunk summaries) add up, so a stage can exceed the request's wall time.
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 * 1024, 5 * 1024 * 1024, 10 * 1024 * 1024,
+                50 * 1024 * 1024)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of the exposition format, one per label set (and bucket)"""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """Gauge whose values are read from callbacks when the metrics are scraped"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            functions = list(self._functions.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(function())}"
+                for key, function in functions]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "legalsimplify_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "legalsimplify_stage_duration_seconds", "Time spent in each stage of document analysis", ["stage"]
+))
+UPSTREAM_RESPONSES = REGISTRY.register(Counter(
+    "legalsimplify_upstream_responses_total", "Hugging Face responses by status code (\"error\" for transport failures)",
+    ["status"]
+))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "legalsimplify_upstream_retries_total", "Hugging Face calls retried, by the status code that caused the retry",
+    ["status"]
+))
+UPSTREAM_REJECTED = REGISTRY.register(Counter(
+    "legalsimplify_upstream_rejected_total", "Hugging Face calls refused without a request because the circuit was open"
+))
+UPSTREAM_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "legalsimplify_upstream_circuit_open", "1 while the upstream circuit refuses calls, 0.5 while half-open"
+))
+UPSTREAM_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "legalsimplify_upstream_concurrency_limit", "Current adaptive limit on concurrent Hugging Face calls"
+))
+COALESCED_CALLS = REGISTRY.register(Counter(
+    "legalsimplify_coalesced_calls_total",
+    "Calls that joined an identical in-flight computation instead of starting their own", ["call"]
+))
+DEGRADED_ANALYSES = REGISTRY.register(Counter(
+    "legalsimplify_degraded_analyses_total", "Analyses served without a model summary"
+))
+REVISION_SECTIONS = REGISTRY.register(Counter(
+    "legalsimplify_revision_sections_total",
+    "Sections of revision-aware analyses, reused from the base version or analyzed", ["result"]
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "legalsimplify_cache_lookups_total", "Cache lookups by cache and outcome (memory_hit, disk_hit, miss)",
+    ["cache", "result"]
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "legalsimplify_cache_hit_ratio", "Share of cache lookups answered from the cache since startup", ["cache"]
+))
+DOCUMENT_BYTES = REGISTRY.register(Histogram(
+    "legalsimplify_document_size_bytes", "Size of uploaded documents", ["type"], buckets=SIZE_BUCKETS
+))
+DOCUMENT_CHARS = REGISTRY.register(Histogram(
+    "legalsimplify_document_characters", "Characters of text analyzed per document", [],
+    buckets=(1000, 5000, 20000, 50000, 100000, 250000, 500000, 1000000, 5000000)
+))
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time a block as one analysis stage, for /metrics and the current request's Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Begin collecting stage timings for the current request; stages timed in child tasks are included"""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def request_timings() -> Optional[Dict[str, float]]:
+    """Stage timings collected so far for the current request, or None outside a request"""
+    return _request_timings.get()
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing or answering too slowly. After
+    failure_threshold consecutive bad calls the circuit opens and calls are refused
+    for open_seconds; then up to half_open_calls trial calls decide whether it
+    closes again or reopens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, slow_call_seconds: Optional[float] = None,
+                 open_seconds: float = 30.0, half_open_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trials = 0
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls would be refused outright, without reserving a trial call"""
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; in half-open state this reserves one of the trial calls"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._trials = 0
+            logger.info("Upstream circuit half-open, sending trial requests")
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._trials += 1
+        return True
+
+    def record_success(self, latency: float) -> None:
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            # A latency spike counts against the upstream just like an error
+            self.record_failure()
+            return
+        if self.state == HALF_OPEN:
+            logger.info("Upstream circuit closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Upstream circuit open for {self.open_seconds:g}s after {self.failures} failures")
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a trial call whose outcome says nothing about upstream health"""
+        if self.state == HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted AIMD-style: each call that finishes within
+    latency_target raises the limit by about one per limit's worth of calls,
+    and a slow or throttled call halves it (at most once per latency_target,
+    so one slow burst doesn't collapse the limit to the floor).
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, latency_target: float,
+                 decrease_factor: float = 0.5):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled just after being handed a slot: pass it on
+            if future.done() and not future.cancelled():
+                self.release(None)
+            raise
+
+    def release(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """
+        Return a slot. latency is None when the call says nothing about upstream
+        speed (e.g. a connection error); overloaded marks throttling and timeouts.
+        """
+        self._in_flight -= 1
+        if overloaded or (latency is not None and latency > self.latency_target):
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        elif latency is not None:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
@@ -0,0 +1,109 @@
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .chunking import split_sections
+from .clause_matcher import ClauseHits, KeywordMatch
+
+
+@dataclass(frozen=True)
+class Section:
+    start: int
+    text: str
+    hash: str  # exact text, so reused clause offsets stay valid
+
+
+def split_into_sections(text: str, max_chars: int) -> List[Section]:
+    return [
+        Section(start=start, text=text[start:end], hash=hashlib.sha256(text[start:end].encode("utf-8")).hexdigest())
+        for start, end in split_sections(text, max_chars)
+    ]
+
+
+def manifest_key(document_hash: str, language: str, model: str, rules_fingerprint: str) -> str:
+    """
+    Cache key for a version's section manifest, by the document's content_hash;
+    manifests hold clause hits, so they are only reused under the same rules
+    """
+    return hashlib.sha256(f"{model}\0{rules_fingerprint}\0{language}\0{document_hash}".encode("utf-8")).hexdigest()
+
+
+def hits_to_json(found: Dict[str, ClauseHits]) -> Dict[str, Any]:
+    """Clause hits of one section, with offsets relative to the section, in a cacheable form"""
+    return {
+        clause_type: {
+            "count": hits.count,
+            "matches": [[m.keyword, m.start, m.end, m.sentence] for m in hits.matches],
+        }
+        for clause_type, hits in found.items()
+    }
+
+
+def merge_hits(sections: Iterable[Tuple[int, Dict[str, Any]]], clause_types: Sequence[str],
+               max_evidence: int) -> Dict[str, ClauseHits]:
+    """Combine per-section hits (start offset, hits_to_json output) into document-wide hits in table order"""
+    merged: Dict[str, ClauseHits] = {}
+    for start, found in sections:
+        for clause_type, hits in found.items():
+            clause_hits = merged.setdefault(clause_type, ClauseHits())
+            clause_hits.count += hits["count"]
+            for keyword, match_start, match_end, sentence in hits["matches"]:
+                if len(clause_hits.matches) >= max_evidence:
+                    break
+                clause_hits.matches.append(KeywordMatch(keyword, start + match_start, start + match_end, sentence))
+    return {clause_type: merged[clause_type] for clause_type in clause_types if clause_type in merged}
+
+
+def _clause_evidence(entries: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[int, Counter]]:
+    """Per clause type, its occurrences and matched sentences in these manifest entries"""
+    evidence: Dict[str, Tuple[int, Counter]] = {}
+    for entry in entries:
+        for clause_type, hits in entry["clauses"].items():
+            count, sentences = evidence.get(clause_type, (0, Counter()))
+            sentences.update(match[3] for match in hits["matches"])
+            evidence[clause_type] = (count + hits["count"], sentences)
+    return evidence
+
+
+def diff_revision(base: Optional[List[Dict[str, Any]]], entries: List[Dict[str, Any]],
+                  clause_types: Sequence[str]) -> Dict[str, Any]:
+    """
+    Compare a version's manifest entries with its base version's. A clause type
+    has "changed" when it is in both versions and the sections that were added,
+    edited or removed differ in its occurrences or matched sentences, so an edit
+    next to a clause, which leaves its evidence as it was, does not count.
+    """
+    reused = Counter(entry["hash"] for entry in base or ())
+    reused_count = 0
+    added_entries = []
+    for entry in entries:
+        if reused[entry["hash"]] > 0:
+            reused[entry["hash"]] -= 1
+            reused_count += 1
+        else:
+            added_entries.append(entry)
+    removed_entries = []
+    for entry in base or ():
+        if reused[entry["hash"]] > 0:
+            # Left over after matching: this section is not in the new version
+            reused[entry["hash"]] -= 1
+            removed_entries.append(entry)
+
+    before = {clause_type for entry in base or () for clause_type in entry["clauses"]}
+    after = {clause_type for entry in entries for clause_type in entry["clauses"]}
+    new_evidence, old_evidence = _clause_evidence(added_entries), _clause_evidence(removed_entries)
+    touched = {clause_type for clause_type in before & after
+               if new_evidence.get(clause_type, (0, Counter())) != old_evidence.get(clause_type, (0, Counter()))}
+    ordered = lambda types: [clause_type for clause_type in clause_types if clause_type in types]
+    return {
+        "sections": len(entries),
+        "sections_reused": reused_count,
+        "sections_analyzed": len(entries) - reused_count,
+        "sections_removed": len(removed_entries),
+        "clause_changes": {
+            "added": ordered(after - before) if base is not None else [],
+            "removed": ordered(before - after) if base is not None else [],
+            "changed": ordered(touched) if base is not None else [],
+        },
+    }
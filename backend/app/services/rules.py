@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ("low", "medium", "high")
+TEXT_PLACEHOLDERS = {"plain_language": "{summary}", "summary_prompt": "{text}"}
+
+
+class RulesError(ValueError):
+    """Raised when the rules file is inconsistent and the service should not start"""
+
+
+@dataclass(frozen=True)
+class ClauseRule:
+    type: str
+    risk_level: str
+    keywords: Tuple[str, ...]
+
+
+class RuleRegistry:
+    """
+    Clause rules and localized text, loaded once from a JSON file and flattened
+    into read-only tables keyed by (clause_type, language). Every supported
+    language has an entry in every table: missing translations fall back to
+    the default language when loading and are listed in `missing`.
+    """
+
+    def __init__(self, data: Mapping[str, Any]):
+        errors: List[str] = []
+        missing: List[str] = []
+        # Identifies this rule set in cache keys, so results cached under other rules are not reused
+        self.fingerprint: str = hashlib.sha256(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+        self.default_language: str = data["default_language"]
+        self.languages: Tuple[Tuple[str, str], ...] = tuple(
+            (language["code"], language["name"]) for language in data["languages"]
+        )
+        codes = tuple(code for code, _ in self.languages)
+        if self.default_language not in codes:
+            errors.append(f"default language {self.default_language!r} is not a supported language")
+
+        aliases = {code: code for code in codes}
+        for alias, code in data.get("aliases", {}).items():
+            if code not in codes:
+                errors.append(f"alias {alias!r} points to unsupported language {code!r}")
+            aliases[alias.lower()] = code
+        self._aliases: Mapping[str, str] = MappingProxyType(aliases)
+
+        def localized(table: Mapping[str, Any], where: str) -> Dict[str, Any]:
+            """Complete a per-language table, falling back to the default language"""
+            if self.default_language not in table:
+                errors.append(f"{where}: no {self.default_language!r} text")
+                return {}
+            for code in table:
+                if code not in codes:
+                    errors.append(f"{where}: unsupported language {code!r}")
+            result = {}
+            for code in codes:
+                if code not in table:
+                    missing.append(f"{where}[{code}]")
+                result[code] = table.get(code, table[self.default_language])
+            return result
+
+        self.risk_scores: Mapping[str, float] = MappingProxyType(
+            {level: float(data["risk_scores"][level]) for level in RISK_LEVELS if level in data["risk_scores"]}
+        )
+        for level in RISK_LEVELS:
+            if level not in self.risk_scores:
+                errors.append(f"risk_scores: no score for {level!r}")
+        self.recommendation_thresholds: Tuple[float, ...] = tuple(data["recommendation_thresholds"])
+
+        risk_labels = {level: localized(data["risk_labels"].get(level, {}), f"risk_labels.{level}")
+                       for level in RISK_LEVELS}
+
+        rules = {}
+        descriptions = {}
+        explanations = {}
+        for clause_type, rule in data["clauses"].items():
+            risk_level = rule.get("risk_level")
+            if risk_level not in RISK_LEVELS:
+                errors.append(f"clauses.{clause_type}: unknown risk level {risk_level!r}")
+                continue
+            rules[clause_type] = ClauseRule(clause_type, risk_level, tuple(rule.get("keywords", ())))
+            for code, text in localized(rule.get("description", {}), f"clauses.{clause_type}.description").items():
+                descriptions[(clause_type, code)] = text
+            explanation = localized(rule.get("explanation", {}), f"clauses.{clause_type}.explanation")
+            # Explanations are shown with a risk label; prebuild all label/explanation combinations
+            for level in RISK_LEVELS:
+                for code, text in explanation.items():
+                    label = risk_labels[level].get(code, level.capitalize() + " risk")
+                    explanations[(clause_type, level, code)] = f"{label}: {text}"
+        if "general" not in rules:
+            errors.append("clauses: a 'general' rule is required as the fallback clause type")
+        self.rules: Mapping[str, ClauseRule] = MappingProxyType(rules)
+        self._descriptions: Mapping[Tuple[str, str], str] = MappingProxyType(descriptions)
+        self._explanations: Mapping[Tuple[str, str, str], str] = MappingProxyType(explanations)
+
+        recommendations = {}
+        for code, tiers in localized(data["recommendations"], "recommendations").items():
+            if len(tiers) != len(self.recommendation_thresholds) + 1:
+                errors.append(f"recommendations[{code}]: expected {len(self.recommendation_thresholds) + 1} tiers")
+            recommendations[code] = tuple(tuple(tier) for tier in tiers)
+        self._recommendations: Mapping[str, Tuple[Tuple[str, ...], ...]] = MappingProxyType(recommendations)
+
+        texts = {}
+        for key, table in data["texts"].items():
+            for code, text in localized(table, f"texts.{key}").items():
+                placeholder = TEXT_PLACEHOLDERS.get(key)
+                if placeholder and placeholder not in text:
+                    errors.append(f"texts.{key}[{code}]: missing {placeholder}")
+                texts[(key, code)] = text
+        self._texts: Mapping[Tuple[str, str], str] = MappingProxyType(texts)
+
+        if errors:
+            raise RulesError("Invalid rules: " + "; ".join(errors))
+        self.missing: Tuple[str, ...] = tuple(missing)
+        if missing:
+            logger.warning(f"{len(missing)} missing translations fall back to {self.default_language!r}: "
+                           f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+
+    def resolve_language(self, language: str) -> str:
+        """Supported language code for a code or alias (e.g. "english"), else the default language"""
+        return self._aliases.get((language or "").strip().lower(), self.default_language)
+
+    def risk_level(self, clause_type: str) -> str:
+        return (self.rules.get(clause_type) or self.rules["general"]).risk_level
+
+    def description(self, clause_type: str, language: str) -> str:
+        return (self._descriptions.get((clause_type, language))
+                or self._descriptions[("general", self.resolve_language(language))])
+
+    def explanation(self, clause_type: str, risk_level: str, language: str) -> str:
+        return (self._explanations.get((clause_type, risk_level, language))
+                or self._explanations[("general", risk_level, self.resolve_language(language))])
+
+    def recommendations(self, risk_score: float, language: str) -> Tuple[str, ...]:
+        tiers = self._recommendations.get(language) or self._recommendations[self.resolve_language(language)]
+        for tier, threshold in zip(tiers, self.recommendation_thresholds):
+            if risk_score < threshold:
+                return tier
+        return tiers[-1]
+
+    def text(self, key: str, language: str) -> str:
+        return self._texts.get((key, language)) or self._texts[(key, self.resolve_language(language))]
+
+    def keyword_patterns(self) -> Dict[str, List[str]]:
+        """Keywords per clause type, in file order, for the clause matcher"""
+        return {clause_type: list(rule.keywords) for clause_type, rule in self.rules.items() if rule.keywords}
+
+
+@lru_cache()
+def load_rules(path: str) -> RuleRegistry:
+    with open(path, encoding="utf-8") as f:
+        return RuleRegistry(json.load(f))
@@ -0,0 +1,53 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict
+
+from .metrics import COALESCED_CALLS
+
+
+class _Call:
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key onto one shared computation.
+    Every waiter receives its own copy of the shared result (so callers may
+    modify it) or the shared exception; the computation is only cancelled once
+    all of its waiters have gone away. Collapsed calls are counted in
+    /metrics under the flight's name.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.collapsed = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.collapsed += 1
+            COALESCED_CALLS.inc(call=self.name)
+
+        call.waiters += 1
+        try:
+            return copy.deepcopy(await asyncio.shield(call.task))
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller was cancelled: stop the upstream work too
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,106 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional, Union
+
+from fastapi import HTTPException, UploadFile
+
+logger = logging.getLogger(__name__)
+
+
+class SpooledUpload:
+    """
+    Upload body kept in memory up to a threshold and rolled over to a named
+    temp file beyond it, so extraction workers can open it by path
+    """
+
+    def __init__(self, memory_threshold: int, spool_dir: Optional[str] = None):
+        self.memory_threshold = memory_threshold
+        self.spool_dir = spool_dir
+        self.size = 0
+        self.path: Optional[str] = None
+        self._buffer = bytearray()
+        self._file = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self._file is None and self.size > self.memory_threshold:
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", dir=self.spool_dir, delete=False)
+            self.path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer += chunk
+
+    def finish(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        """What extractors read from: a file path once spooled to disk, otherwise the bytes"""
+        return self.path if self.path is not None else bytes(self._buffer)
+
+    def read_bytes(self) -> bytes:
+        return read_source(self.source)
+
+    def save(self, path: str) -> None:
+        """Move the upload to a permanent location; the spooled copy is gone afterwards"""
+        if self.path is not None:
+            self.finish()
+            shutil.move(self.path, path)
+            self.path = None
+        else:
+            with open(path, "wb") as f:
+                f.write(self._buffer)
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._buffer = bytearray()
+
+
+def read_source(source: Union[str, bytes]) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB."
+    )
+
+
+async def spool_upload(file: UploadFile, max_size: int, chunk_size: int,
+                       memory_threshold: int, spool_dir: Optional[str] = None) -> SpooledUpload:
+    """Stream an upload in fixed-size chunks, stopping with a 413 as soon as it exceeds max_size"""
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    upload = SpooledUpload(memory_threshold, spool_dir)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            if upload.size + len(chunk) > max_size:
+                raise _too_large(max_size)
+            upload.write(chunk)
+        upload.finish()
+    except BaseException:
+        upload.close()
+        raise
+    return upload
@@ -0,0 +1,89 @@
+"""
+Clause scan against the keyword scan it replaced
+
+    cd backend && python -m bench.clause_scan --size-mb 5 --max-ratio 3
+
+Times ClauseMatcher.find on synthetic contracts (English, Hindi, and English
+text with no clause keywords) next to the original scan, which lowercased the
+document and tested each keyword with `in`. That scan stopped at the first
+keyword of each clause type, so it is also timed counting every occurrence
+(str.count per keyword), the least work that reports occurrences as the matcher
+does; the run exits non-zero when the matcher is more than --max-ratio times
+slower than the counting scan on any corpus.
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.services.clause_matcher import ClauseMatcher
+from app.config import get_settings
+from app.services.rules import load_rules
+
+from .corpus import generate_text
+
+KEYWORD_FREE = (
+    "The parties met on the first day of the month to review the schedule. "
+    "Each team presented its plan and the minutes were circulated afterwards.\n\n"
+)
+
+
+def baseline_scan(patterns: Dict[str, Sequence[str]], text: str) -> List[str]:
+    """The original detection: any keyword as a substring of the lowercased text"""
+    content_lower = text.lower()
+    return [clause_type for clause_type, keywords in patterns.items()
+            if any(keyword in content_lower for keyword in keywords)]
+
+
+def counting_scan(patterns: Dict[str, Sequence[str]], text: str) -> Dict[str, int]:
+    """The original scan, counting every occurrence instead of stopping at the first"""
+    content_lower = text.lower()
+    return {clause_type: sum(content_lower.count(keyword) for keyword in keywords)
+            for clause_type, keywords in patterns.items()}
+
+
+def best_of(runs: int, scan: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        scan()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the clause matcher against the original keyword scan")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="fail when the matcher is this many times slower than the counting scan")
+    args = parser.parse_args(argv)
+
+    size = int(args.size_mb * 1_000_000)
+    corpora = {
+        "en": generate_text("en", size),
+        "hi": generate_text("hi", size),
+        "keyword-free": (KEYWORD_FREE * (size // len(KEYWORD_FREE) + 1))[:size],
+    }
+    patterns = load_rules(get_settings().rules_path).keyword_patterns()
+    matcher = ClauseMatcher(patterns)
+    matcher.compile()
+
+    failures = []
+    print(f"{'corpus':<14} {'original':>10} {'counting':>10} {'matcher':>10} {'ratio':>7}")
+    for name, text in corpora.items():
+        original = best_of(args.runs, lambda: baseline_scan(patterns, text))
+        counting = best_of(args.runs, lambda: counting_scan(patterns, text))
+        current = best_of(args.runs, lambda: matcher.find(text))
+        ratio = current / counting if counting else float("inf")
+        print(f"{name:<14} {original:>9.3f}s {counting:>9.3f}s {current:>9.3f}s {ratio:>6.1f}x")
+        if args.max_ratio is not None and ratio > args.max_ratio:
+            failures.append(f"{name}: matcher is {ratio:.1f}x the counting scan (limit {args.max_ratio:.1f}x)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
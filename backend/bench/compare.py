@@ -0,0 +1,99 @@
+"""
+Compare two benchmark result files
+
+    python -m bench.compare bench/results/before.json bench/results/after.json --threshold 10
+
+Prints per-scenario latency, throughput and memory deltas and exits non-zero
+when any scenario regressed by more than the threshold percentage.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[str, str, str, int]
+
+
+def load(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    return {
+        (s["endpoint"], s["format"], s["language"], s["size_chars"]): s
+        for s in results["scenarios"]
+    }
+
+
+def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """Percentage change from before to after"""
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before: Dict[Key, Dict[str, Any]], after: Dict[Key, Dict[str, Any]],
+            threshold: float) -> Tuple[List[List[str]], List[str]]:
+    rows = []
+    regressions = []
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        name = f"{key[0]} {key[2]}-{key[3]}.{key[1]}"
+        deltas = {
+            "p50": change(old["latency_ms"]["p50"], new["latency_ms"]["p50"]),
+            "p95": change(old["latency_ms"]["p95"], new["latency_ms"]["p95"]),
+            "p99": change(old["latency_ms"]["p99"], new["latency_ms"]["p99"]),
+            "rps": change(old["rps"], new["rps"]),
+            "rss": change(old.get("peak_rss_mb"), new.get("peak_rss_mb")),
+        }
+        rows.append([name] + [_format(new_value, delta) for new_value, delta in (
+            (new["latency_ms"]["p50"], deltas["p50"]),
+            (new["latency_ms"]["p95"], deltas["p95"]),
+            (new["latency_ms"]["p99"], deltas["p99"]),
+            (new["rps"], deltas["rps"]),
+            (new.get("peak_rss_mb"), deltas["rss"]),
+        )])
+
+        # Higher latency or memory is worse; lower throughput is worse
+        worse = [metric for metric in ("p50", "p95", "rss") if (deltas[metric] or 0) > threshold]
+        if (deltas["rps"] or 0) < -threshold:
+            worse.append("rps")
+        if sum(new["errors"].values()) > sum(old["errors"].values()):
+            worse.append("errors")
+        if worse:
+            regressions.append(f"{name}: {', '.join(worse)}")
+    return rows, regressions
+
+
+def _format(value: Optional[float], delta: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.1f} ({delta:+.0f}%)" if delta is not None else f"{value:.1f}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    rows, regressions = compare(before, after, args.threshold)
+
+    header = ["scenario", "p50 ms", "p95 ms", "p99 ms", "rps", "peak rss MB"]
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+    only = set(before) ^ set(after)
+    if only:
+        print(f"\n{len(only)} scenarios appear in only one of the runs and were skipped")
+    if regressions:
+        print(f"\nRegressions over {args.threshold:.0f}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
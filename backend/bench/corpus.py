@@ -0,0 +1,221 @@
+"""
+Synthetic legal documents for benchmarks: contract-like text in each supported
+language, rendered as TXT, DOCX and PDF at a requested size
+"""
+import io
+import json
+import os
+import random
+from typing import Dict, List
+
+from docx import Document
+
+LANGUAGES = ("en", "hi", "bn", "ta", "te")
+FORMATS = ("txt", "docx", "pdf")
+
+# Sentences carry the clause keywords the analyzer looks for, so clause detection does real work
+SENTENCES: Dict[str, List[str]] = {
+    "en": [
+        "The Supplier shall indemnify and hold harmless the Customer against all claims arising from this Agreement.",
+        "Neither party shall be liable for indirect damages, and total liability is limited to the fees paid.",
+        "Either party may terminate this Agreement on thirty days written notice to the other party.",
+        "The Recipient shall keep all confidential information secret and use it only for the stated purpose.",
+        "The Customer shall make payment of each invoice within forty five days of receipt.",
+        "The Supplier warrants that the services will be performed with reasonable skill and care.",
+        "This Agreement is governed by the laws of India and the courts of Mumbai have jurisdiction.",
+        "Any notice under this Agreement must be in writing and delivered to the registered address.",
+    ],
+    "hi": [
+        "आपूर्तिकर्ता इस समझौते से उत्पन्न सभी दावों के लिए ग्राहक की क्षतिपूर्ति करेगा।",
+        "किसी भी पक्ष का अप्रत्यक्ष नुकसान के लिए दायित्व नहीं होगा और कुल दायित्व भुगतान की गई फीस तक सीमित है।",
+        "कोई भी पक्ष तीस दिनों की लिखित सूचना देकर इस समझौते की समाप्ति कर सकता है।",
+        "प्राप्तकर्ता सभी गोपनीय जानकारी को सुरक्षित रखेगा और केवल बताए गए उद्देश्य के लिए उपयोग करेगा।",
+        "ग्राहक प्रत्येक चालान का भुगतान प्राप्ति के पैंतालीस दिनों के भीतर करेगा।",
+        "आपूर्तिकर्ता वारंटी देता है कि सेवाएं उचित कौशल और सावधानी से प्रदान की जाएंगी।",
+        "यह समझौता भारत के कानूनों द्वारा शासित है और मुंबई के न्यायालयों को अधिकार क्षेत्र प्राप्त है।",
+    ],
+    "bn": [
+        "সরবরাহকারী এই চুক্তি থেকে উদ্ভূত সমস্ত দাবির জন্য গ্রাহককে ক্ষতিপূরণ দেবে।",
+        "কোনো পক্ষ পরোক্ষ ক্ষতির জন্য দায় বহন করবে না এবং মোট দায় প্রদত্ত ফি পর্যন্ত সীমিত।",
+        "যেকোনো পক্ষ ত্রিশ দিনের লিখিত নোটিশ দিয়ে এই চুক্তির সমাপ্তি ঘটাতে পারে।",
+        "প্রাপক সমস্ত গোপনীয় তথ্য সুরক্ষিত রাখবে এবং শুধুমাত্র নির্ধারিত উদ্দেশ্যে ব্যবহার করবে।",
+        "গ্রাহক প্রতিটি চালানের পেমেন্ট প্রাপ্তির পঁয়তাল্লিশ দিনের মধ্যে করবে।",
+        "সরবরাহকারী ওয়ারেন্টি দেয় যে পরিষেবাগুলি যথাযথ দক্ষতা ও যত্নের সাথে প্রদান করা হবে।",
+        "এই চুক্তি ভারতের আইন দ্বারা পরিচালিত এবং মুম্বাইয়ের আদালতের এখতিয়ার রয়েছে।",
+    ],
+    "ta": [
+        "இந்த ஒப்பந்தத்தால் எழும் அனைத்து கோரிக்கைகளுக்கும் வழங்குநர் வாடிக்கையாளருக்கு இழப்பீடு வழங்குவார்.",
+        "மறைமுக சேதங்களுக்கு எந்த தரப்புக்கும் பொறுப்பு இல்லை மற்றும் மொத்த பொறுப்பு செலுத்திய கட்டணத்திற்கு உட்பட்டது.",
+        "எந்த தரப்பும் முப்பது நாள் எழுத்துப்பூர்வ அறிவிப்புடன் இந்த ஒப்பந்தத்தின் முடிவு செய்யலாம்.",
+        "பெறுநர் அனைத்து ரகசிய தகவல்களையும் பாதுகாப்பாக வைத்திருக்க வேண்டும்.",
+        "வாடிக்கையாளர் ஒவ்வொரு விலைப்பட்டியலுக்கும் கட்டணம் நாற்பத்தைந்து நாட்களுக்குள் செலுத்த வேண்டும்.",
+        "சேவைகள் நியாயமான திறமையுடன் வழங்கப்படும் என்று வழங்குநர் உத்தரவாதம் அளிக்கிறார்.",
+        "இந்த ஒப்பந்தம் இந்திய சட்டங்களால் நிர்வகிக்கப்படுகிறது.",
+    ],
+    "te": [
+        "ఈ ఒప్పందం నుండి ఉత్పన్నమయ్యే అన్ని క్లెయిమ్‌లకు సరఫరాదారు వినియోగదారుకు పరిహారం చెల్లిస్తారు.",
+        "పరోక్ష నష్టాలకు ఏ పక్షానికీ బాధ్యత ఉండదు మరియు మొత్తం బాధ్యత చెల్లించిన రుసుముకు పరిమితం.",
+        "ఏ పక్షమైనా ముప్పై రోజుల లిఖిత నోటీసుతో ఈ ఒప్పందం ముగింపు చేయవచ్చు.",
+        "గ్రహీత అన్ని గోప్య సమాచారాన్ని సురక్షితంగా ఉంచాలి.",
+        "వినియోగదారు ప్రతి ఇన్వాయిస్‌కు చెల్లింపు నలభై ఐదు రోజులలోపు చేయాలి.",
+        "సేవలు సహేతుకమైన నైపుణ్యంతో అందించబడతాయని సరఫరాదారు వారంటీ ఇస్తారు.",
+        "ఈ ఒప్పందం భారతదేశ చట్టాలచే నిర్వహించబడుతుంది.",
+    ],
+}
+
+HEADINGS = {
+    "en": "Clause",
+    "hi": "खंड",
+    "bn": "ধারা",
+    "ta": "பிரிவு",
+    "te": "నిబంధన",
+}
+
+
+def generate_text(language: str, size_chars: int, seed: int = 0) -> str:
+    """Numbered clauses of shuffled sentences, stopping once size_chars is reached"""
+    rng = random.Random(f"{language}:{size_chars}:{seed}")
+    sentences = SENTENCES[language]
+    paragraphs = []
+    length = 0
+    number = 1
+    while length < size_chars:
+        body = " ".join(rng.choice(sentences) for _ in range(rng.randint(2, 5)))
+        paragraph = f"{number}. {HEADINGS[language]} {number}\n{body}"
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+        number += 1
+    return "\n\n".join(paragraphs)[:max(size_chars, 1)]
+
+
+def make_docx(text: str) -> bytes:
+    """Word document with one paragraph per line and every fifth clause laid out as a table"""
+    document = Document()
+    for index, paragraph in enumerate(text.split("\n\n")):
+        heading, _, body = paragraph.partition("\n")
+        if index % 5 == 4:
+            table = document.add_table(rows=1, cols=2)
+            table.cell(0, 0).text = heading
+            table.cell(0, 1).text = body
+        else:
+            document.add_paragraph(heading)
+            document.add_paragraph(body)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines = []
+    for paragraph in text.split("\n"):
+        while len(paragraph) > width:
+            cut = paragraph.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+    return lines
+
+
+def make_pdf(text: str, lines_per_page: int = 60, width: int = 95) -> bytes:
+    """
+    Minimal PDF with one text object per page. Non-Latin scripts are written with
+    single-byte codes and a ToUnicode CMap, which is enough for text extraction
+    even though the standard font has no glyphs for them.
+    """
+    lines = _wrap(text, width)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    ascii_only = all(ord(char) < 128 for char in text)
+    codes: Dict[str, int] = {}
+    if not ascii_only:
+        for char in sorted(set(text) - {"\n"}):
+            codes[char] = len(codes) + 1
+        if len(codes) > 255:
+            raise ValueError("Too many distinct characters for a single-byte font")
+
+    def encode_line(line: str) -> str:
+        if ascii_only:
+            return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+        return "<" + "".join(f"{codes[char]:02X}" for char in line) + ">"
+
+    objects: List[bytes] = []
+    page_ids = [5 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(pages)} >>".encode())
+    if ascii_only:
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        objects.append(b"<< >>")
+    else:
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /ToUnicode 4 0 R >>")
+        entries = "\n".join(f"<{code:02X}> <{ord(char):04X}>" for char, code in codes.items())
+        cmap = (
+            "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+            "1 begincodespacerange\n<00> <FF>\nendcodespacerange\n"
+            f"{len(codes)} beginbfchar\n{entries}\nendbfchar\n"
+            "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+        ).encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(cmap) + cmap + b"\nendstream")
+
+    for page in pages:
+        content = ("BT /F1 9 Tf 40 800 Td 12 TL " + " ".join(f"{encode_line(line)} Tj T*" for line in page)
+                   + " ET").encode("latin-1")
+        content_id = len(objects) + 2
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def render(text: str, file_format: str) -> bytes:
+    if file_format == "txt":
+        return text.encode("utf-8")
+    if file_format == "docx":
+        return make_docx(text)
+    if file_format == "pdf":
+        return make_pdf(text)
+    raise ValueError(f"Unknown format: {file_format}")
+
+
+def build_corpus(out_dir: str, sizes: List[int], languages=LANGUAGES, formats=FORMATS) -> List[Dict]:
+    """Write one document per (language, size, format) and a manifest.json describing them"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for language in languages:
+        for size in sizes:
+            text = generate_text(language, size)
+            for file_format in formats:
+                filename = f"{language}-{size}.{file_format}"
+                data = render(text, file_format)
+                with open(os.path.join(out_dir, filename), "wb") as f:
+                    f.write(data)
+                manifest.append({"file": filename, "language": language, "size_chars": size,
+                                 "format": file_format, "bytes": len(data)})
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark corpus")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "corpus"))
+    parser.add_argument("--sizes", default="2000,20000,200000", help="comma-separated sizes in characters")
+    args = parser.parse_args()
+    entries = build_corpus(args.out, [int(size) for size in args.sizes.split(",")])
+    print(f"Wrote {len(entries)} documents to {args.out}")
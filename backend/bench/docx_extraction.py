@@ -0,0 +1,59 @@
+"""
+DOCX extraction time against a budget
+
+    cd backend && python -m bench.docx_extraction --sections 600 --budget-seconds 2
+
+Builds a Word document of headed sections (about 150k characters with the
+default 600), extracts it in process the way an extraction worker does, and
+exits non-zero when the median time is over budget. Resolving each paragraph's
+style through python-docx took several seconds on this document.
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from docx import Document
+
+from app.services.extraction import extract_docx
+
+
+def make_document(sections: int, paragraphs_per_section: int = 5) -> bytes:
+    document = Document()
+    document.add_heading("Lease Agreement", 0)
+    for section in range(sections):
+        document.add_heading(f"Section {section}", 1)
+        for paragraph in range(paragraphs_per_section):
+            document.add_paragraph(f"Clause {section}.{paragraph}: the tenant shall pay rent on time.")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure DOCX extraction time against a budget")
+    parser.add_argument("--sections", type=int, default=600)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    data = make_document(args.sections)
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = extract_docx(data)
+        timings.append(time.perf_counter() - start)
+    elapsed = statistics.median(timings)
+    print(f"extract_docx: {len(result.text)} characters, {len(result.segments)} segments, "
+          f"median {elapsed:.3f}s over {args.runs} runs")
+
+    if args.budget_seconds is not None and elapsed > args.budget_seconds:
+        print(f"FAIL: extraction took {elapsed:.3f}s, over the {args.budget_seconds:.3f}s budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
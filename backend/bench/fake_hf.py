@@ -0,0 +1,79 @@
+"""
+Local stand-in for the Hugging Face inference API, so benchmarks measure the
+backend rather than the network or a shared model
+
+    python -m bench.fake_hf --port 8900 --latency 0.2 --warmup 5 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(latency: float = 0.05, latency_per_input: float = 0.01, jitter: float = 0.2,
+               warmup_seconds: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    """
+    latency: base seconds per request, plus latency_per_input for each list input,
+    scaled by up to +/- jitter. For warmup_seconds after startup every call gets a
+    503 "model loading" answer with estimated_time; afterwards error_rate of calls
+    get a 503 without one.
+    """
+    app = FastAPI(title="Fake Hugging Face inference API")
+    rng = random.Random(seed)
+    started_at = time.monotonic()
+    stats = {"requests": 0, "inputs": 0, "warmup_503": 0, "errors": 0}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", **stats}
+
+    @app.post("/models/{model:path}")
+    async def infer(model: str, request: Request):
+        stats["requests"] += 1
+        remaining = warmup_seconds - (time.monotonic() - started_at)
+        if remaining > 0:
+            stats["warmup_503"] += 1
+            return JSONResponse({"error": f"Model {model} is currently loading", "estimated_time": remaining},
+                                status_code=503)
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "Service Unavailable"}, status_code=503)
+
+        payload = await request.json()
+        inputs = payload.get("inputs")
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        stats["inputs"] += len(batch)
+
+        delay = (latency + latency_per_input * len(batch)) * (1 + rng.uniform(-jitter, jitter))
+        await asyncio.sleep(max(0.0, delay))
+
+        max_length = (payload.get("parameters") or {}).get("max_length", 120)
+        results = [{"summary_text": " ".join(str(text).split()[:max_length // 4])} for text in batch]
+        # Like the real API, a single input still gets a one-element list back
+        return results
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Hugging Face inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-per-input", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of 503 'model loading' after startup")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency, args.latency_per_input, args.jitter, args.warmup, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cold-start budget for the backend
+
+    cd backend && python -m bench.import_time --budget-ms 1500 --startup-budget-ms 500
+
+Imports app.main in fresh interpreters (python -X importtime), then runs the
+app's startup and shutdown once, and exits non-zero when the median import
+time or the startup time is over budget, or when a module that should only
+load on first use (the document parsers, the HTTP client) is imported eagerly.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use: extraction runs in worker processes, and upstream calls open the client lazily
+DEFERRED = ("PyPDF2", "docx", "httpx")
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+eager = [name for name in %r if name in sys.modules]
+startup = None
+if %r:
+    async def run():
+        async with app.main.app.router.lifespan_context(app.main.app):
+            return time.perf_counter()
+    ready = asyncio.run(run())
+    startup = (ready - imported) * 1000
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": startup, "eager": eager}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def probe(startup: bool, env: Dict[str, str]) -> Tuple[Dict, List[Tuple[str, int, int]]]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE % (DEFERRED, startup)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1]), parse_importtime(process.stderr)
+
+
+def top_level(rows: List[Tuple[str, int, int]], count: int) -> List[Tuple[str, int]]:
+    """Slowest top-level packages by cumulative import time"""
+    totals: Dict[str, int] = {}
+    for name, _, cumulative in rows:
+        if "." not in name:
+            totals[name] = max(totals.get(name, 0), cumulative)
+    return sorted(totals.items(), key=lambda item: -item[1])[:count]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure backend import and startup time against a budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="median import time of app.main")
+    parser.add_argument("--startup-budget-ms", type=float, default=None,
+                        help="lifespan startup time (no startup check when omitted)")
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep the probe's databases and spool files out of the working tree
+        env = dict(os.environ, PYTHONPATH=BACKEND_DIR,
+                   DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'history.db')}",
+                   JOB_DB_PATH=os.path.join(workdir, "jobs.db"),
+                   JOB_SPOOL_DIR=os.path.join(workdir, "spool"))
+        results = [probe(startup=False, env=env) for _ in range(args.runs)]
+        startup = probe(startup=True, env=env)[0]["startup_ms"] if args.startup_budget_ms is not None else None
+
+    import_ms = statistics.median(result["import_ms"] for result, _ in results)
+    eager = sorted({name for result, _ in results for name in result["eager"]})
+    print(f"import app.main: median {import_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    if startup is not None:
+        print(f"startup: {startup:.0f} ms (budget {args.startup_budget_ms:.0f} ms)")
+    print("slowest packages (cumulative, last run):")
+    for name, cumulative in top_level(results[-1][1], args.top):
+        print(f"  {name:<24} {cumulative / 1000:8.1f} ms")
+
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import time {import_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if startup is not None and startup > args.startup_budget_ms:
+        failures.append(f"startup time {startup:.0f} ms is over the {args.startup_budget_ms:.0f} ms budget")
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""
+End-to-end benchmark of the analysis endpoints against a local fake Hugging Face server
+
+    cd backend && python -m bench.run --sizes 2000,20000 --requests 30 --concurrency 8
+
+Starts bench.fake_hf and the backend under uvicorn as subprocesses, replays the
+synthetic corpus against each endpoint and writes latency percentiles, throughput,
+peak RSS and per-stage timings (from Server-Timing) to bench/results/<label>.json.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from .corpus import FORMATS, LANGUAGES, build_corpus, generate_text, render
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "bench", "results")
+CONTENT_TYPES = {
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+ENDPOINTS = ("analyze", "stream", "batch")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent pid; the command name in field 2 may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def process_tree_rss(pid: int) -> int:
+    """Resident memory of a process and all its descendants (extraction workers included)"""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _rss_bytes(current)
+        pending.extend(_children(current))
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Samples the server's process-tree RSS in the background and keeps the peak since the last reset"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self.enabled = os.path.isdir("/proc")
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while self.enabled and not self._stop_event.is_set():
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+            self._stop_event.wait(self.interval)
+
+    def reset(self) -> None:
+        self.peak = process_tree_rss(self.pid) if self.enabled else 0
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile, p in [0, 100]"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else None,
+        "max": max(values) if values else None,
+    }
+
+
+def parse_timing_event(body: str) -> Dict[str, float]:
+    """The {stage: milliseconds} of an /analyze/stream body's timing event"""
+    for message in body.split("\n\n"):
+        lines = message.strip().splitlines()
+        if lines and lines[0] == "event: timing":
+            return json.loads(lines[1][len("data: "):])
+    return {}
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Server-Timing header to {stage: milliseconds}"""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def document_variants(document: Dict[str, Any], count: int, seeds: Iterator[int]) -> List[bytes]:
+    """
+    count renderings of a corpus document, each generated from its own seed: same
+    language, size and format, but differently shuffled clauses, so concurrent
+    requests cannot share work through request coalescing or the chunk cache
+    """
+    return [render(generate_text(document["language"], document["size_chars"], seed=next(seeds)), document["format"])
+            for _ in range(count)]
+
+
+async def run_scenario(client: httpx.AsyncClient, endpoint: str, document: Dict[str, Any], payloads: List[bytes],
+                       requests: int, concurrency: int, batch_items: int) -> Tuple[Dict[str, Any], List[float]]:
+    """
+    Send requests uploads of one document with bounded concurrency, taking file
+    contents from payloads in turn; returns the summary and raw latencies
+    """
+    latencies: List[float] = []
+    first_event: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    form = {"language": document["language"]}
+    items = batch_items if endpoint == "batch" else 1
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+
+    async def send(index: int) -> None:
+        content_type = CONTENT_TYPES[document["format"]]
+        uploads = [(document["file"], payloads[(index * items + item) % len(payloads)], content_type)
+                   for item in range(items)]
+        start = time.perf_counter()
+        if endpoint == "analyze":
+            response = await client.post("/analyze", files={"file": uploads[0]}, data=form)
+        elif endpoint == "batch":
+            response = await client.post("/analyze/batch", files=[("files", upload) for upload in uploads], data=form)
+        else:
+            first = None
+            body = []
+            async with client.stream("POST", "/analyze/stream", files={"file": uploads[0]}, data=form) as response:
+                async for chunk in response.aiter_text():
+                    if first is None:
+                        first = (time.perf_counter() - start) * 1000
+                    body.append(chunk)
+            if first is not None:
+                first_event.append(first)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+            return
+        latencies.append(elapsed)
+        if endpoint == "stream":
+            # The header only covers stages before the first event; the final timing event has them all
+            timings = parse_timing_event("".join(body))
+        else:
+            timings = parse_server_timing(response.headers.get("server-timing"))
+        for stage, duration in timings.items():
+            stages.setdefault(stage, []).append(duration)
+
+    async def worker() -> None:
+        while not queue.empty():
+            index = queue.get_nowait()
+            try:
+                await send(index)
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    result = {
+        "requests": requests,
+        "completed": len(latencies),
+        "errors": errors,
+        "wall_seconds": wall,
+        "rps": len(latencies) / wall if wall else 0.0,
+        "latency_ms": distribution(latencies),
+        "stages_ms": {stage: distribution(values) for stage, values in sorted(stages.items())},
+    }
+    if endpoint == "stream":
+        result["first_event_ms"] = distribution(first_event)
+    return result, latencies
+
+
+def start_servers(args: argparse.Namespace, workdir: str):
+    hf_port, app_port = free_port(), free_port()
+    fake_hf = subprocess.Popen(
+        [sys.executable, "-m", "bench.fake_hf", "--port", str(hf_port), "--latency", str(args.hf_latency),
+         "--latency-per-input", str(args.hf_latency_per_input), "--warmup", str(args.hf_warmup),
+         "--error-rate", str(args.hf_error_rate), "--seed", str(args.seed)],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        wait_ready(f"http://127.0.0.1:{hf_port}/health", fake_hf)
+    except Exception:
+        fake_hf.terminate()
+        raise
+
+    env = dict(
+        os.environ,
+        HUGGINGFACE_API_URL=f"http://127.0.0.1:{hf_port}/models",
+        HUGGINGFACE_API_KEY="bench",
+        SERVER_TIMING="true",
+        JOB_BACKEND="memory",
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'history.db')}",
+        ANALYSIS_CACHE_DB="",
+        MAX_FILE_SIZE=str(100 * 1024 * 1024),
+    )
+    if not args.cache:
+        # Every request should pay for a full analysis unless cache behavior is what's being measured
+        env["ANALYSIS_CACHE_MAX_ENTRIES"] = "0"
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        wait_ready(f"http://127.0.0.1:{app_port}/", backend)
+    except Exception:
+        backend.terminate()
+        fake_hf.terminate()
+        raise
+    return fake_hf, backend, f"http://127.0.0.1:{app_port}"
+
+
+def summarize_endpoints(scenarios: List[Dict[str, Any]], latencies: Dict[str, List[float]]) -> Dict[str, Any]:
+    """Aggregate per endpoint: latency over all its requests, throughput and the worst peak RSS"""
+    summary = {}
+    for endpoint, values in latencies.items():
+        runs = [scenario for scenario in scenarios if scenario["endpoint"] == endpoint]
+        completed = sum(run["completed"] for run in runs)
+        wall = sum(run["wall_seconds"] for run in runs)
+        peaks = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+        summary[endpoint] = {
+            "scenarios": len(runs),
+            "completed": completed,
+            "errors": sum(sum(run["errors"].values()) for run in runs),
+            "rps": completed / wall if wall else 0.0,
+            "latency_ms": distribution(values),
+            "peak_rss_mb": max(peaks) if peaks else None,
+        }
+    return summary
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace, base_url: str, sampler: RssSampler, corpus_dir: str,
+              manifest: List[Dict[str, Any]]) -> Dict[str, Any]:
+    scenarios = []
+    latencies: Dict[str, List[float]] = {}
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    # The corpus files use seed 0; every variant gets a later one, so no two uploads have the same text
+    seeds = itertools.count(1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for endpoint in args.endpoints:
+            for document in manifest:
+                if args.repeat_documents:
+                    with open(os.path.join(corpus_dir, document["file"]), "rb") as f:
+                        payloads = [f.read()]
+                else:
+                    count = args.requests * (args.batch_items if endpoint == "batch" else 1)
+                    payloads = await asyncio.to_thread(document_variants, document, count, seeds)
+                sampler.reset()
+                result, values = await run_scenario(client, endpoint, document, payloads, args.requests,
+                                                    args.concurrency, args.batch_items)
+                scenario = {
+                    "endpoint": endpoint,
+                    "format": document["format"],
+                    "language": document["language"],
+                    "size_chars": document["size_chars"],
+                    "bytes": document["bytes"],
+                    "peak_rss_mb": sampler.peak / (1024 * 1024) if sampler.enabled else None,
+                    **result,
+                }
+                scenarios.append(scenario)
+                latencies.setdefault(endpoint, []).extend(values)
+                latency = result["latency_ms"]
+                print(f"{endpoint:8} {document['file']:22} p50={_ms(latency['p50'])} p95={_ms(latency['p95'])} "
+                      f"p99={_ms(latency['p99'])} rps={result['rps']:.1f} errors={sum(result['errors'].values())}")
+        metrics = (await client.get("/metrics")).text
+
+    return {
+        "meta": {
+            "label": args.label,
+            "git_revision": git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "endpoints": summarize_endpoints(scenarios, latencies),
+        "scenarios": scenarios,
+        "metrics": metrics,
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:.0f}ms" if value is not None else "-"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the LegalSimplify backend")
+    parser.add_argument("--sizes", default="2000,20000,200000", help="document sizes in characters")
+    parser.add_argument("--languages", default=",".join(LANGUAGES))
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--endpoints", default="analyze", help=f"comma-separated, from {','.join(ENDPOINTS)}")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-items", type=int, default=8, help="documents per /analyze/batch request")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--cache", action="store_true", help="keep the analysis caches enabled")
+    parser.add_argument("--repeat-documents", action="store_true",
+                        help="upload the same file in every request, so concurrent requests can share work")
+    parser.add_argument("--hf-latency", type=float, default=0.05)
+    parser.add_argument("--hf-latency-per-input", type=float, default=0.01)
+    parser.add_argument("--hf-warmup", type=float, default=0.0)
+    parser.add_argument("--hf-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=time.strftime("%Y%m%d-%H%M%S"))
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.languages = args.languages.split(",")
+    args.formats = args.formats.split(",")
+    args.endpoints = args.endpoints.split(",")
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="legalsimplify-bench-") as workdir:
+        corpus_dir = os.path.join(workdir, "corpus")
+        manifest = build_corpus(corpus_dir, args.sizes, args.languages, args.formats)
+        fake_hf, backend, base_url = start_servers(args, workdir)
+        sampler = RssSampler(backend.pid)
+        sampler.start()
+        try:
+            results = asyncio.run(run(args, base_url, sampler, corpus_dir, manifest))
+        finally:
+            sampler.stop()
+            backend.terminate()
+            fake_hf.terminate()
+            backend.wait(timeout=30)
+            fake_hf.wait(timeout=30)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{args.label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
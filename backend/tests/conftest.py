@@ -0,0 +1,120 @@
+import asyncio
+import json
+import time
+from contextlib import ExitStack
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.auth import issue_token
+from app.config import Settings, get_settings
+from app.models import Base
+from app.services.ai_service import AIService
+
+AUTH_SECRET = "test-secret"
+
+
+@pytest.fixture
+def rules_data():
+    """A fresh copy of rules.json, for tests that build a RuleRegistry from edited rules"""
+    with open(get_settings().rules_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """
+    Factory for an AIService (not in mock mode) whose model is faked: summarize
+    gives each summary and delay is awaited first. Returns (service, calls), calls
+    recording (text, final) per request. The model call is faked below the chunk
+    cache; with chunk_cache=False, _summarize_text is faked instead, so repeated
+    chunks reach the fake too.
+    """
+    def make(summarize=lambda text: "Short summary.", delay=0.0, chunk_cache=True):
+        service = AIService()
+        service.mock_mode = False
+        calls = []
+
+        async def fake_summarize(text, language, final):
+            calls.append((text, final))
+            if delay:
+                await asyncio.sleep(delay)
+            return summarize(text)
+
+        monkeypatch.setattr(service, "_query_summary" if chunk_cache else "_summarize_text", fake_summarize)
+        return service, calls
+
+    return make
+
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """
+    Start an app (the real one by default) with test settings and return its
+    TestClient: mock analysis, in-memory jobs and caches, extraction in a thread,
+    and the history database and job files under tmp_path. Settings are patched
+    on the Settings class, since modules read them with get_settings(); pass
+    overrides as keyword arguments.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(main, "SessionLocal", sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+    monkeypatch.setattr(main, "init_db", lambda: Base.metadata.create_all(bind=engine))
+    defaults = {
+        "huggingface_api_key": "",
+        "cache_db_path": "",
+        "job_backend": "memory",
+        "job_spool_dir": str(tmp_path / "spool"),
+        "extraction_workers": 0,
+        "history_flush_interval": 0.01,
+        "warmup": False,
+    }
+
+    with ExitStack() as stack:
+        def start(app=main.app, **overrides):
+            for name, value in dict(defaults, **overrides).items():
+                monkeypatch.setattr(Settings, name, value)
+            return stack.enter_context(TestClient(app))
+
+        yield start
+    engine.dispose()
+
+
+@pytest.fixture
+def history_client(api_client):
+    """
+    The app's routes with bearer authentication on and the history routes
+    mounted, which the real app only does when AUTH_SECRET is set at import
+    """
+    app = FastAPI(lifespan=main.lifespan)
+    app.include_router(main.app.router)
+    app.include_router(main.history_router)
+    return api_client(app, auth_secret=AUTH_SECRET)
+
+
+@pytest.fixture
+def auth_headers():
+    """Authorization headers for a user id, signed with history_client's secret"""
+    return lambda user_id: {"Authorization": f"Bearer {issue_token(user_id, AUTH_SECRET)}"}
+
+
+@pytest.fixture
+def wait_for_history():
+    """
+    History is written in batches behind the request: returns a function that
+    polls a client's /history until it lists count items, and returns them
+    """
+    def wait(client, headers, count):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            items = client.get("/history", params={"limit": 100}, headers=headers).json()["items"]
+            if len(items) >= count:
+                return items
+            time.sleep(0.02)
+        raise AssertionError(f"history did not reach {count} items")
+
+    return wait
+
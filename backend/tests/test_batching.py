@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.batching import MicroBatcher
+from app.services.hf_client import HuggingFaceError
+
+
+class FakeClient:
+    def __init__(self, delay=0.01, error=None):
+        self.delay = delay
+        self.error = error
+        self.payloads = []
+
+    async def query(self, payload):
+        self.payloads.append(payload)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        inputs = payload["inputs"]
+        if isinstance(inputs, str):
+            return [{"summary_text": inputs.upper()}]
+        return [{"summary_text": text.upper()} for text in inputs]
+
+
+def test_concurrent_inputs_share_one_request():
+    async def main():
+        client = FakeClient()
+        batcher = MicroBatcher(client, max_batch_size=8, max_wait=0.01)
+        results = await asyncio.gather(*(batcher.query(text, {"max_length": 10}) for text in "abc"))
+        return client, batcher, results
+
+    client, batcher, results = asyncio.run(main())
+    assert [result["summary_text"] for result in results] == ["A", "B", "C"]
+    assert len(client.payloads) == 1 and client.payloads[0]["inputs"] == ["a", "b", "c"]
+    assert batcher.batches_sent == 1 and not batcher._tasks
+
+
+def test_full_batch_is_sent_without_waiting():
+    async def main():
+        client = FakeClient()
+        batcher = MicroBatcher(client, max_batch_size=2, max_wait=10)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.query("a", {}), batcher.query("b", {})), timeout=1
+        )
+
+    assert len(asyncio.run(main())) == 2
+
+
+def test_upstream_error_reaches_every_caller():
+    async def main():
+        batcher = MicroBatcher(FakeClient(error=HuggingFaceError("down")), max_batch_size=8, max_wait=0.01)
+        return await asyncio.gather(batcher.query("a", {}), batcher.query("b", {}), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(main())] == [HuggingFaceError, HuggingFaceError]
+
+
+def test_close_cancels_waiting_and_in_flight_batches():
+    async def main():
+        batcher = MicroBatcher(FakeClient(delay=10), max_batch_size=2, max_wait=10)
+        in_flight = [asyncio.ensure_future(batcher.query(text, {})) for text in "ab"]
+        waiting = asyncio.ensure_future(batcher.query("c", {"other": 1}))
+        await asyncio.sleep(0.01)
+        assert len(batcher._tasks) == 1
+
+        await batcher.close()
+        for future in in_flight + [waiting]:
+            with pytest.raises(asyncio.CancelledError):
+                await future
+        return batcher
+
+    batcher = asyncio.run(main())
+    assert not batcher._tasks and not batcher._pending and not batcher._timers
+
+
+def test_failed_batch_items_do_not_fail_the_others(api_client, monkeypatch):
+    client = api_client()
+    ai_service = client.app.state.services.ai_service
+    analyze_document = ai_service.analyze_document
+
+    async def analyze_or_fail(content, language):
+        if "explode" in content:
+            raise RuntimeError("model exploded")
+        return await analyze_document(content, language)
+
+    monkeypatch.setattr(ai_service, "analyze_document", analyze_or_fail)
+
+    response = client.post("/analyze/batch", data={"texts": ["Either party may terminate.", "explode"]}, files=[
+        ("files", ("lease.txt", b"The tenant shall pay the fee monthly.", "text/plain")),
+        ("files", ("setup.exe", b"MZ", "application/octet-stream")),
+        ("files", ("scan.pdf", b"not a pdf", "application/pdf")),
+    ])
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["filename"] for result in results] == ["lease.txt", "setup.exe", "scan.pdf", None, None]
+    assert [result["analysis"] is not None for result in results] == [True, False, False, True, False]
+    assert results[1]["error"].startswith("Unsupported file type")
+    assert results[2]["error"].startswith("Failed to process document")
+    assert results[4]["error"] == "Analysis error: model exploded"
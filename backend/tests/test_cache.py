@@ -0,0 +1,103 @@
+import asyncio
+
+from app.services import cache as cache_module
+from app.services.cache import AnalysisCache, analysis_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_the_ttl(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    cache = AnalysisCache(ttl_seconds=60, db_path=str(tmp_path / "cache.db"))
+
+    async def main():
+        await cache.set("key", {"summary": "A summary."})
+        clock.now += 59
+        fresh = await cache.get("key")
+        clock.now += 2
+        expired = await cache.get("key")
+        return fresh, expired
+
+    fresh, expired = asyncio.run(main())
+    cache.close()
+    assert fresh == {"summary": "A summary."}
+    assert expired is None
+
+
+def test_memory_tier_keeps_the_most_recently_used_entries():
+    cache = AnalysisCache(max_entries=2)
+
+    async def main():
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == [1, None, 3]
+    assert cache.stats()["size"] == 2
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+
+    async def main():
+        first = AnalysisCache(db_path=db_path)
+        await first.set("key", {"summary": "A summary."})
+        first.close()
+        second = AnalysisCache(db_path=db_path)
+        value = await second.get("key")
+        stats = second.stats()
+        second.close()
+        return value, stats
+
+    value, stats = asyncio.run(main())
+    assert value == {"summary": "A summary."}
+    assert stats["disk_hits"] == 1
+
+
+def test_namespaces_do_not_share_entries(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+
+    async def main():
+        analyses = AnalysisCache(db_path=db_path)
+        chunks = AnalysisCache(db_path=db_path, namespace="chunk")
+        await analyses.set("key", "analysis")
+        await chunks.set("key", "chunk summary")
+        values = await analyses.get("key"), await chunks.get("key")
+        analyses.close()
+        chunks.close()
+        return values
+
+    assert asyncio.run(main()) == ("analysis", "chunk summary")
+
+
+def test_hits_and_misses_are_counted():
+    cache = AnalysisCache()
+
+    async def main():
+        await cache.get("key")
+        await cache.set("key", {"clauses": []})
+        value = await cache.get("key")
+        value["clauses"].append("changed by the caller")
+        return await cache.get("key")
+
+    assert asyncio.run(main()) == {"clauses": []}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["disk_hits"]) == (2, 1, 0)
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_key_ignores_whitespace_but_not_language_model_or_rules():
+    key = analysis_key("The fee  is\n due.", "en", "model", "rules")
+    assert key == analysis_key(" The fee is due. ", "en", "model", "rules")
+    assert key != analysis_key("The fee is due.", "hi", "model", "rules")
+    assert key != analysis_key("The fee is due.", "en", "other-model", "rules")
+    assert key != analysis_key("The fee is due.", "en", "model", "other-rules")
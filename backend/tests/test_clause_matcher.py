@@ -0,0 +1,76 @@
+from app.services.clause_matcher import ClauseMatcher
+
+PATTERNS = {
+    "payment": ["payment", "fee"],
+    "confidentiality": ["confidential", "secret"],
+    "termination": ["terminate", "termination"],
+    "warranty": ["warranty", "warrant"],
+    "indemnification": ["क्षतिपूर्ति"],
+}
+
+
+def found(text):
+    return {clause_type: hits.count for clause_type, hits in ClauseMatcher(PATTERNS).find(text).items()}
+
+
+def test_inflected_keywords_match():
+    text = "Fees and payments are due. Either party terminated it. The warranties survive. Keep it secrets."
+    assert found(text) == {"payment": 2, "confidentiality": 1, "termination": 1, "warranty": 1}
+
+
+def test_other_words_sharing_a_stem_do_not_match():
+    text = "We feel the feet of the secretary were warm. The feedback was secretive."
+    assert found(text) == {}
+
+
+def test_whitespace_inside_a_keyword_matches_any_run():
+    matcher = ClauseMatcher({"indemnification": ["hold harmless"]})
+    hits = matcher.find("shall hold\n  harmless the buyer")
+    assert hits["indemnification"].count == 1
+    assert hits["indemnification"].matches[0].keyword == "hold harmless"
+
+
+def test_indic_keywords_match_with_case_endings():
+    assert found("विक्रेता क्षतिपूर्ति करेगा और क्षतिपूर्तिकर्ता भी") == {"indemnification": 2}
+
+
+def test_match_offsets_and_sentence():
+    text = "Intro. The fee is fixed. Outro."
+    match = ClauseMatcher(PATTERNS).find(text)["payment"].matches[0]
+    assert text[match.start:match.end] == "fee"
+    assert match.sentence == "The fee is fixed."
+
+
+def test_rules_list_derived_forms_the_suffix_does_not_cover():
+    from app.config import get_settings
+    from app.services.rules import load_rules
+
+    matcher = ClauseMatcher(load_rules(get_settings().rules_path).keyword_patterns())
+    hits = matcher.find("This confidentiality clause survives. The order was cancelled.")
+    assert set(hits) == {"confidentiality", "termination"}
+
+    # Forms the baseline's substring check caught
+    for text, clause_type in [
+        ("Cancellation requires notice.", "termination"),
+        ("The buyer is cancelling the order.", "termination"),
+        ("On expiry of the term.", "termination"),
+        ("Upon expiration of this lease.", "termination"),
+        ("The seller gives an indemnity.", "indemnification"),
+        ("Mutual indemnities apply.", "indemnification"),
+    ]:
+        assert set(matcher.find(text)) == {clause_type}, text
+
+
+def test_longest_keyword_wins_where_keywords_overlap():
+    matcher = ClauseMatcher({"indemnification": ["hold harmless"], "liability": ["harmless"]})
+    hits = matcher.find("The SELLER shall Hold Harmless the buyer; a harmless error.")
+    assert {clause_type: h.count for clause_type, h in hits.items()} == {"indemnification": 1, "liability": 1}
+    assert hits["liability"].matches[0].start == 44
+
+
+def test_offsets_hold_when_lowercasing_changes_the_length():
+    # "İ" lowercases to two characters, so the matcher falls back to the document-wide regex
+    text = "İstanbul office. The FEE is fixed."
+    match = ClauseMatcher(PATTERNS).find(text)["payment"].matches[0]
+    assert text[match.start:match.end] == "FEE"
+    assert match.sentence == "The FEE is fixed."
@@ -0,0 +1,69 @@
+import io
+
+import docx
+import pytest
+from docx.text.paragraph import Paragraph
+
+from app.services import extraction
+from app.services.extraction import extract_docx
+
+
+def make_docx(sections, paragraphs_per_section=5):
+    document = docx.Document()
+    document.add_heading("Lease Agreement", 0)
+    for section in range(sections):
+        document.add_heading(f"Section {section}", 1)
+        for paragraph in range(paragraphs_per_section):
+            document.add_paragraph(f"Clause {section}.{paragraph}: the tenant shall pay rent on time.")
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Rent"
+    table.rows[0].cells[1].text = "1000"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_docx_segments_follow_their_heading():
+    result = extract_docx(make_docx(2, paragraphs_per_section=2))
+
+    assert [(segment.text, segment.heading) for segment in result.segments] == [
+        ("Lease Agreement", "Lease Agreement"),
+        ("Section 0", "Section 0"),
+        ("Clause 0.0: the tenant shall pay rent on time.", "Section 0"),
+        ("Clause 0.1: the tenant shall pay rent on time.", "Section 0"),
+        ("Section 1", "Section 1"),
+        ("Clause 1.0: the tenant shall pay rent on time.", "Section 1"),
+        ("Clause 1.1: the tenant shall pay rent on time.", "Section 1"),
+        ("Rent", "Section 1"),
+        ("1000", "Section 1"),
+    ]
+    assert (result.segments[-1].table, result.segments[-1].row, result.segments[-1].cell) == (0, 0, 1)
+
+
+def test_heading_styles_are_resolved_once_per_document(monkeypatch):
+    data = make_docx(50)
+    calls = []
+    heading_style_ids = extraction.docx_heading_style_ids
+    monkeypatch.setattr(extraction, "docx_heading_style_ids", lambda doc: calls.append(doc) or heading_style_ids(doc))
+    # Paragraph.style looks the style up among all of the document's styles on every access
+    style_lookups = []
+    style = Paragraph.style
+    monkeypatch.setattr(Paragraph, "style", property(
+        lambda paragraph: style_lookups.append(paragraph) or style.fget(paragraph), style.fset
+    ))
+
+    result = extract_docx(data)
+
+    assert len(calls) == 1
+    assert style_lookups == []
+    assert sum(segment.text.startswith("Section") for segment in result.segments) == 50
+
+
+@pytest.mark.parametrize("path", ["/analyze", "/analyze/stream", "/analyze/revision"])
+def test_mode_is_checked_for_text_as_well_as_files(api_client, path):
+    client = api_client()
+
+    response = client.post(path, data={"text": "The tenant shall pay the fee monthly.", "mode": "bogus"})
+
+    assert response.status_code == 400
+    assert client.post(path, data={"text": "The tenant shall pay the fee monthly.", "mode": "quick"}).status_code == 200
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.extraction import ExtractionError, ExtractionPool
+
+
+def work(name, seconds=0.2):
+    if name == "crash":
+        os._exit(1)
+    time.sleep(seconds)
+    return name
+
+
+def run_pool(coroutine_factory, workers=2):
+    async def main():
+        pool = ExtractionPool(workers=workers)
+        try:
+            return pool, await coroutine_factory(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_crash_fails_only_the_document_that_caused_it():
+    async def scenario(pool):
+        await pool.run(work, "warm", 0)
+        return await asyncio.gather(
+            pool.run(work, "a", 1), pool.run(work, "crash"), pool.run(work, "b", 1), return_exceptions=True
+        )
+
+    _, results = run_pool(scenario)
+    assert results[0] == "a" and results[2] == "b"
+    assert isinstance(results[1], ExtractionError)
+
+
+def test_timeout_does_not_fail_other_documents_on_the_pool():
+    async def scenario(pool):
+        await asyncio.gather(pool.run(work, "warm", 0), pool.run(work, "warm", 0))
+        stuck_pool = pool._executor
+        processes = list(stuck_pool._processes.values())
+        results = await asyncio.gather(
+            pool.run(work, "stuck", 30, timeout=0.5), pool.run(work, "slow", 1.5), return_exceptions=True
+        )
+        after = await pool.run(work, "after", 0)
+        await asyncio.sleep(0.2)
+        return stuck_pool, processes, results, after
+
+    pool, (stuck_pool, processes, results, after) = run_pool(scenario)
+    assert isinstance(results[0], ExtractionError)
+    assert results[1] == "slow"
+    assert after == "after"
+    # The retired pool, with its stuck worker, is gone once nothing else ran on it
+    assert pool._executor is not stuck_pool
+    assert not pool._retired and not pool._active
+    assert len(processes) == 2 and all(not process.is_alive() for process in processes)
+
+
+def test_thread_mode_times_out():
+    async def scenario(pool):
+        with pytest.raises(ExtractionError):
+            await pool.run(work, "stuck", 1, timeout=0.1)
+        return await pool.run(work, "ok", 0)
+
+    assert run_pool(scenario, workers=0)[1] == "ok"
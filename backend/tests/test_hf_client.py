@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.services import hf_client
+from app.services.hf_client import HuggingFaceClient, HuggingFaceError
+
+
+def make_client(monkeypatch, responses, **settings):
+    """A client whose upstream answers with the given responses in order, recording requests and backoff delays"""
+    config = Settings()
+    config.hf_max_retries = 3
+    config.hf_backoff_base = 0.5
+    config.hf_backoff_max = 20
+    for name, value in settings.items():
+        setattr(config, name, value)
+    client = HuggingFaceClient(config)
+    requests, delays = [], []
+    pending = list(responses)
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        response = pending.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    client._httpx = httpx
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(hf_client.asyncio, "sleep", fake_sleep)
+    return client, requests, delays
+
+
+def run(client, payload):
+    async def main():
+        try:
+            return await client.query(payload)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+def test_transient_errors_are_retried_with_growing_backoff(monkeypatch):
+    client, requests, delays = make_client(monkeypatch, [
+        httpx.Response(503, json={"error": "overloaded"}),
+        httpx.Response(502, text="bad gateway"),
+        httpx.ConnectError("connection refused"),
+        httpx.Response(200, json=[{"summary_text": "A summary."}]),
+    ])
+
+    assert run(client, {"inputs": "text"}) == [{"summary_text": "A summary."}]
+    assert len(requests) == 4
+    # Jittered within [ceiling / 2, ceiling] of base * 2 ** attempt
+    for attempt, delay in enumerate(delays):
+        ceiling = 0.5 * 2 ** attempt
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_estimated_load_time_stretches_the_backoff(monkeypatch):
+    client, _, delays = make_client(monkeypatch, [
+        httpx.Response(503, json={"error": "Model is loading", "estimated_time": 7.5}),
+        httpx.Response(503, json={"error": "Model is loading", "estimated_time": 600}),
+        httpx.Response(200, json=[{"summary_text": "A summary."}]),
+    ])
+
+    run(client, {"inputs": "text"})
+    assert delays == [7.5, 20]
+
+
+def test_retries_are_bounded(monkeypatch):
+    client, requests, delays = make_client(monkeypatch, [httpx.Response(500, json={"error": "boom"})] * 4)
+
+    with pytest.raises(HuggingFaceError) as error:
+        run(client, {"inputs": "text"})
+    assert error.value.status_code == 500
+    assert len(requests) == 4 and len(delays) == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    client, requests, _ = make_client(monkeypatch, [httpx.Response(400, json={"error": "bad input"})])
+
+    with pytest.raises(HuggingFaceError, match="bad input"):
+        run(client, {"inputs": "text"})
+    assert len(requests) == 1
+
+
+def test_non_json_success_body_is_a_client_error(monkeypatch):
+    client, _, _ = make_client(monkeypatch, [httpx.Response(200, text="<html>gateway page</html>")])
+
+    with pytest.raises(HuggingFaceError) as error:
+        run(client, {"inputs": "text"})
+    assert error.value.status_code == 200
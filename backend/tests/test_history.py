@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import get_current_user, issue_token, verify_token
+from app.config import Settings, get_settings
+from app.main import Services
+from app.models import Base, DocumentHistory, User
+from app.services.history import HistoryWriter
+from app.services.rules import load_rules
+
+ANALYSIS = {"summary": "Short summary.", "risk_score": 0.4}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    # sqlite only checks foreign keys when asked to, unlike the databases this runs on in production
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def count(session_factory, column):
+    with session_factory() as session:
+        return session.scalar(select(func.count(column)))
+
+
+def test_stop_writes_the_batch_being_collected(session_factory):
+    async def main():
+        writer = HistoryWriter(session_factory, batch_size=100, flush_interval=60)
+        writer.start()
+        for index in range(3):
+            writer.record(7, "lease.pdf", f"hash-{index}", "en", ANALYSIS)
+        # Let the writer take the records off the queue into its batch
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+    asyncio.run(main())
+    assert count(session_factory, DocumentHistory.id) == 3
+
+
+def test_first_record_creates_the_user_row(session_factory):
+    async def main():
+        writer = HistoryWriter(session_factory, batch_size=2, flush_interval=0.01)
+        writer.start()
+        writer.record(7, "lease.pdf", "hash-a", "en", ANALYSIS)
+        writer.record(7, "lease.pdf", "hash-a", "en", dict(ANALYSIS, risk_score=0.9))
+        writer.record(8, None, "hash-b", "en", ANALYSIS)
+        await writer.stop()
+        return await writer.list_for_user(7, limit=10)
+
+    items, _ = asyncio.run(main())
+    assert [item["risk_score"] for item in items] == [0.9]
+    assert count(session_factory, User.id) == 2
+
+
+def test_token_round_trip():
+    token = issue_token(7, "secret")
+    assert verify_token(token, "secret") == 7
+    assert verify_token(token, "other secret") is None
+    assert verify_token(token.replace("7.", "8.", 1), "secret") is None
+    assert verify_token(issue_token(7, "secret", ttl_seconds=-1), "secret") is None
+    assert verify_token(token, "") is None
+
+
+def test_current_user_comes_from_the_bearer_token(monkeypatch):
+    monkeypatch.setattr(Settings, "auth_secret", "secret")
+    assert get_current_user(None) is None
+    assert get_current_user(f"Bearer {issue_token(7, 'secret')}") == 7
+    assert get_current_user("Basic dXNlcjpwYXNz") is None
+    with pytest.raises(HTTPException) as error:
+        get_current_user("Bearer 7.9999999999.forged")
+    assert error.value.status_code == 401
+
+
+def test_authorization_is_ignored_without_a_secret(monkeypatch):
+    monkeypatch.setattr(Settings, "auth_secret", "")
+    assert get_current_user("Basic abc") is None
+    assert get_current_user("Bearer 7.9999999999.forged") is None
+
+
+def test_history_records_the_resolved_language():
+    recorded = []
+    services = SimpleNamespace(
+        history_writer=SimpleNamespace(record=lambda *args: recorded.append(args)),
+        ai_service=SimpleNamespace(rules=load_rules(get_settings().rules_path)),
+    )
+    Services.record_history(services, 7, None, "The fee is due.", "english", ANALYSIS)
+    Services.record_history(services, None, None, "The fee is due.", "en", ANALYSIS)
+    assert [args[3] for args in recorded] == ["en"]
+
+
+def test_history_pages_follow_the_cursor(history_client, auth_headers, wait_for_history):
+    client, headers = history_client, auth_headers(7)
+    for number in range(5):
+        assert client.post("/analyze", data={"text": f"Document {number}: the fee is due."},
+                           headers=headers).status_code == 200
+    everything = wait_for_history(client, headers, 5)
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/history", params=params, headers=headers).json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(items) for items in pages] == [2, 2, 1]
+    assert [item["id"] for items in pages for item in items] == [item["id"] for item in everything]
+    assert all(item["analysis_result"] is None for items in pages for item in items)
+    full = client.get("/history", params={"limit": 1, "full": True}, headers=headers).json()["items"][0]
+    assert full["id"] == everything[0]["id"] and full["analysis_result"]["summary"] == full["summary"]
+    # Other users see none of it
+    assert client.get("/history", headers=auth_headers(8)).json() == {"items": [], "next_cursor": None}
+
+
+def test_history_refuses_bad_cursors_and_anonymous_callers(history_client, auth_headers):
+    response = history_client.get("/history", params={"cursor": "not-a-cursor"}, headers=auth_headers(7))
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+    assert history_client.get("/history").status_code == 401
+
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.config import Settings
+from app.main import Services
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_parsers_and_http_client_are_not_imported_with_the_app():
+    # Extraction runs in worker processes and upstream calls open their client lazily
+    probe = "import sys, app.main; print(sorted({'PyPDF2', 'docx', 'httpx'} & set(sys.modules)))"
+    process = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True,
+                             env=dict(os.environ, PYTHONPATH=BACKEND_DIR), check=True)
+    assert process.stdout.strip() == "[]"
+
+
+def test_one_settings_object_configures_the_services():
+    settings = Settings()
+    settings.job_backend = "memory"
+    settings.extraction_workers = 0
+    settings.summary_chunk_chars = 1234
+
+    services = Services(settings)
+
+    assert services.ai_service.settings is settings
+    assert services.document_processor.settings is settings
+    assert services.ai_service.client.settings is settings
+    asyncio.run(services.ai_service.aclose())
+    services.document_processor.shutdown()
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import threading
+import time
+
+from starlette.requests import Request
+
+from app.config import Settings
+from app.main import job_client_id
+from app.services.jobs import DONE, QUEUED, RUNNING, Job, JobQueue, MemoryJobStore, SqliteJobStore
+
+
+def test_memory_store_claims_by_priority_within_client_limit():
+    async def main():
+        store = MemoryJobStore()
+        low = Job(client_id="a", language="en", priority=0)
+        high = Job(client_id="a", language="en", priority=5)
+        other = Job(client_id="b", language="en", priority=0)
+        for job in (low, high, other):
+            await store.add(job)
+        first = await store.claim_next(per_client_limit=1)
+        second = await store.claim_next(per_client_limit=1)
+        blocked = await store.claim_next(per_client_limit=1)
+        await store.finish(first)
+        third = await store.claim_next(per_client_limit=1)
+        return (first, second, blocked, third), (low, high, other)
+
+    (first, second, blocked, third), (low, high, other) = asyncio.run(main())
+    assert first is high and second is other and blocked is None and third is low
+
+
+def test_concurrent_stores_claim_each_job_once(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    stores = [SqliteJobStore(db_path) for _ in range(4)]
+    jobs = [Job(client_id=f"client-{i}", language="en") for i in range(40)]
+    for job in jobs:
+        asyncio.run(stores[0].add(job))
+
+    claimed = []
+    barrier = threading.Barrier(len(stores))
+
+    def drain(store):
+        barrier.wait()
+        while True:
+            job = store._claim(per_client_limit=100)
+            if job is None:
+                return
+            claimed.append((store.worker_id, job.id))
+
+    threads = [threading.Thread(target=drain, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(job_id for _, job_id in claimed) == sorted(job.id for job in jobs)
+    for worker_id, job_id in claimed:
+        assert asyncio.run(stores[0].get(job_id)).worker_id == worker_id
+    for store in stores:
+        store.close()
+
+
+def test_only_expired_leases_are_requeued(tmp_path):
+    async def main():
+        live = SqliteJobStore(str(tmp_path / "jobs.db"), lease_seconds=60)
+        crashed = SqliteJobStore(str(tmp_path / "jobs.db"), lease_seconds=0.05)
+        await live.add(Job(client_id="a", language="en"))
+        await live.add(Job(client_id="b", language="en"))
+        held = await live.claim_next(per_client_limit=1)
+        lost = await crashed.claim_next(per_client_limit=1)
+        await asyncio.sleep(0.1)
+        requeued = await live.requeue_expired()
+        states = (await live.get(held.id), await live.get(lost.id))
+        live.close()
+        crashed.close()
+        return requeued, states
+
+    requeued, (held, lost) = asyncio.run(main())
+    assert requeued == 1
+    assert held.status == RUNNING and lost.status == QUEUED and lost.worker_id is None
+
+
+def test_finish_is_ignored_without_the_lease(tmp_path):
+    async def main():
+        owner = SqliteJobStore(str(tmp_path / "jobs.db"))
+        other = SqliteJobStore(str(tmp_path / "jobs.db"))
+        await owner.add(Job(client_id="a", language="en"))
+        job = await owner.claim_next(per_client_limit=1)
+        job.status = DONE
+        job.result = {"summary": "stale"}
+        await other.finish(job)
+        after_other = await owner.get(job.id)
+        job.result = {"summary": "fresh"}
+        await owner.finish(job)
+        after_owner = await owner.get(job.id)
+        owner.close()
+        other.close()
+        return after_other, after_owner
+
+    after_other, after_owner = asyncio.run(main())
+    assert after_other.status == RUNNING and after_other.result is None
+    assert after_owner.status == DONE and after_owner.result == {"summary": "fresh"}
+
+
+def test_worker_survives_store_errors(monkeypatch):
+    async def main():
+        store = MemoryJobStore()
+        claim_next = store.claim_next
+        failures = iter([RuntimeError("database is locked")])
+
+        async def flaky_claim(per_client_limit):
+            for error in failures:
+                raise error
+            return await claim_next(per_client_limit)
+
+        monkeypatch.setattr(store, "claim_next", flaky_claim)
+        monkeypatch.setattr(asyncio, "sleep", _no_sleep(asyncio.sleep))
+
+        async def handler(job):
+            return {"summary": job.text}
+
+        queue = JobQueue(store, handler, workers=1, max_queued=10, per_client_limit=1, result_ttl=60)
+        await queue.start()
+        job = await queue.submit(Job(client_id="a", language="en", text="hello"))
+        deadline = time.time() + 2
+        while job.status != DONE and time.time() < deadline:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.status == DONE and job.result == {"summary": "hello"}
+
+
+def _no_sleep(sleep):
+    """Skip the worker's one-second back-off so the test does not wait for it"""
+    async def short_sleep(delay, *args, **kwargs):
+        return await sleep(min(delay, 0.01), *args, **kwargs)
+    return short_sleep
+
+
+def test_jobs_are_counted_against_the_user_or_address_not_a_caller_chosen_id(monkeypatch):
+    def request(host, client_id=None):
+        headers = [(b"x-client-id", client_id.encode())] if client_id else []
+        return Request({"type": "http", "client": (host, 40000), "headers": headers})
+
+    monkeypatch.setattr(Settings, "trusted_proxies", ["10.0.0.1"])
+    assert job_client_id(request("203.0.113.5", "fresh-id"), None) == "203.0.113.5"
+    assert job_client_id(request("203.0.113.5", "fresh-id"), 7) == "user:7"
+    assert job_client_id(request("10.0.0.1", "tenant-a"), None) == "client:tenant-a"
+    assert job_client_id(request("10.0.0.1"), None) == "10.0.0.1"
+
+
+def test_submitted_job_is_polled_until_done(api_client):
+    client = api_client()
+
+    response = client.post("/jobs", data={"language": "english"},
+                           files={"file": ("lease.txt", b"The tenant shall pay the fee monthly.", "text/plain")})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in (QUEUED, RUNNING, DONE) and job["result"] is None
+
+    deadline = time.monotonic() + 5
+    while job["status"] != DONE and time.monotonic() < deadline:
+        time.sleep(0.02)
+        job = client.get(f"/jobs/{job['job_id']}").json()
+
+    assert job["status"] == DONE and job["error"] is None
+    assert job["finished_at"] is not None
+    assert job["result"]["summary"] and job["result"]["clauses"]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_full_queue_refuses_jobs_with_503(api_client, tmp_path):
+    # No workers, so the first job stays queued
+    client = api_client(job_workers=0, job_max_queued=1)
+    upload = {"file": ("lease.txt", b"The tenant shall pay the fee monthly.", "text/plain")}
+
+    assert client.post("/jobs", files=upload).status_code == 202
+    response = client.post("/jobs", files=upload)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    # The refused upload was not spooled
+    assert len(os.listdir(tmp_path / "spool")) == 1
+
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import add_server_timing
+from app.services.metrics import (
+    REQUEST_SECONDS, Counter, Gauge, Histogram, MetricsRegistry, _Metric, request_timings, timed,
+)
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("legalsimplify_test", "Base metric")
+
+
+def test_counter_values_by_label_set():
+    counter = Counter("legalsimplify_test_total", "Test counter", ["status"])
+    counter.inc(status="200")
+    counter.inc(2, status="200")
+    counter.inc(status="503")
+
+    assert counter.value(status="200") == 3
+    assert counter.value(status="503") == 1
+    assert counter.value(status="404") == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("legalsimplify_test_seconds", "Test histogram", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="scan")
+
+    assert histogram.count(stage="scan") == 4
+    assert histogram.count(stage="other") == 0
+    assert histogram.render()[2:] == [
+        'legalsimplify_test_seconds_bucket{stage="scan",le="0.1"} 2',
+        'legalsimplify_test_seconds_bucket{stage="scan",le="1"} 3',
+        'legalsimplify_test_seconds_bucket{stage="scan",le="+Inf"} 4',
+        'legalsimplify_test_seconds_sum{stage="scan"} 3.65',
+        'legalsimplify_test_seconds_count{stage="scan"} 4',
+    ]
+
+
+def test_registry_renders_exposition_format():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("legalsimplify_test_total", "Calls by \"status\"", ["status"]))
+    gauge = registry.register(Gauge("legalsimplify_test_ratio", "Test gauge"))
+    counter.inc(status='bad "quote"\n')
+    gauge.set_function(lambda: 0.5)
+
+    assert registry.render() == (
+        '# HELP legalsimplify_test_total Calls by "status"\n'
+        "# TYPE legalsimplify_test_total counter\n"
+        'legalsimplify_test_total{status="bad \\"quote\\"\\n"} 1\n'
+        "# HELP legalsimplify_test_ratio Test gauge\n"
+        "# TYPE legalsimplify_test_ratio gauge\n"
+        "legalsimplify_test_ratio 0.5\n"
+    )
+
+
+def test_streamed_request_is_timed_when_the_stream_ends():
+    app = FastAPI()
+    app.middleware("http")(add_server_timing)
+    seen = {}
+
+    @app.get("/test-stream")
+    async def stream():
+        async def events():
+            yield "event: first\n\n"
+            with timed("summarization"):
+                await asyncio.sleep(0.2)
+            seen.update(request_timings())
+            yield "event: result\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    with TestClient(app) as client:
+        response = client.get("/test-stream")
+
+    assert response.text == "event: first\n\nevent: result\n\n"
+    # Stages that run while the body streams are still collected for the request
+    assert seen["summarization"] >= 0.2
+    labels = dict(method="GET", route="/test-stream", status="200")
+    assert REQUEST_SECONDS.count(**labels) == 1
+    total = next(line for line in REQUEST_SECONDS.render()
+                 if line.startswith('legalsimplify_request_duration_seconds_sum{method="GET",route="/test-stream"'))
+    assert float(total.rsplit(" ", 1)[1]) >= 0.2
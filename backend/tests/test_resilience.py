@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, AdaptiveLimiter, CircuitBreaker
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_after_a_trial():
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=0.05, half_open_calls=1)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == OPEN and breaker.is_open
+    assert not breaker.allow() and breaker.rejected == 1
+
+    time.sleep(0.06)
+    assert not breaker.is_open
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED and breaker.times_opened == 1
+
+
+def test_failed_trial_reopens_and_released_trial_is_given_back():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.05, half_open_calls=1)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow() and breaker.times_opened == 2
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_seconds=1.0)
+    breaker.record_success(5.0)
+    breaker.record_success(5.0)
+    assert breaker.state == OPEN
+
+
+def test_limiter_caps_in_flight_calls_and_serves_waiters_in_order():
+    async def main():
+        limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=2, latency_target=1.0)
+        order = []
+        peak = 0
+
+        async def call(index):
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            order.append(index)
+            await asyncio.sleep(0.01)
+            limiter.release(0.01)
+
+        await asyncio.gather(*(call(index) for index in range(6)))
+        return limiter, order, peak
+
+    limiter, order, peak = asyncio.run(main())
+    assert peak == 2 and order == list(range(6)) and limiter.in_flight == 0
+
+
+def test_limiter_backs_off_once_per_latency_target_and_recovers():
+    async def main():
+        limiter = AdaptiveLimiter(initial=16, min_limit=2, max_limit=16, latency_target=0.05)
+        for _ in range(4):
+            await limiter.acquire()
+        limiter.release(None, overloaded=True)
+        limiter.release(1.0)  # same slow burst: no second decrease
+        after_burst = limiter.limit
+        await asyncio.sleep(0.06)
+        limiter.release(1.0)
+        after_second = limiter.limit
+        limiter.release(0.01)
+        return after_burst, after_second, limiter
+
+    after_burst, after_second, limiter = asyncio.run(main())
+    assert after_burst == 8 and after_second == 4
+    assert limiter._limit > 4 and limiter.in_flight == 0
+
+
+def test_cancelled_waiter_passes_its_slot_on():
+    async def main():
+        limiter = AdaptiveLimiter(initial=1, min_limit=1, max_limit=1, latency_target=1.0)
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(None)  # hands the slot to the first waiter ...
+        first.cancel()  # ... which is cancelled before it runs
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, timeout=1)
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.in_flight == 1
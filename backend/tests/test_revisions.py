@@ -0,0 +1,91 @@
+import asyncio
+
+from app.services.ai_service import AIService
+from app.services.cache import content_hash
+from app.services.revisions import diff_revision
+from app.services.rules import RuleRegistry
+
+CLAUSE_TYPES = ("termination", "payment", "warranty", "confidentiality")
+DOCUMENT = "1. Termination\nEither party may terminate this agreement.\n\n2. Payment\nThe tenant shall pay rent monthly."
+
+
+def test_manifest_from_other_rules_is_not_reused(rules_data):
+    service = AIService()
+
+    async def main():
+        first = await service.analyze_revision(DOCUMENT, "en")
+        base_hash = first["revision"]["content_hash"]
+        same_rules = await service.analyze_revision(DOCUMENT, "en", base_hash)
+        rules_data["clauses"]["termination"]["keywords"].append("rescind")
+        service.rules = RuleRegistry(rules_data)
+        other_rules = await service.analyze_revision(DOCUMENT, "en", base_hash)
+        await service.aclose()
+        return same_rules, other_rules
+
+    same_rules, other_rules = asyncio.run(main())
+    assert same_rules["revision"]["base_found"]
+    assert not other_rules["revision"]["base_found"]
+
+
+def entry(hash, **clauses):
+    return {"hash": hash, "summary": None, "clauses": {
+        clause_type: {"count": len(sentences), "matches": [["kw", 0, 2, sentence] for sentence in sentences]}
+        for clause_type, sentences in clauses.items()
+    }}
+
+
+def test_edit_that_keeps_a_clause_evidence_is_not_a_change():
+    base = [entry("a", termination=["Either party may terminate."]), entry("b", payment=["Rent is due."])]
+    # Section "a" was edited: a sentence without clauses was appended to it
+    edited = [entry("a2", termination=["Either party may terminate."]), entry("b", payment=["Rent is due."])]
+    reworded = [entry("a3", termination=["Either party may terminate at will."]), entry("b", payment=["Rent is due."])]
+
+    unchanged = diff_revision(base, edited, CLAUSE_TYPES)
+    assert unchanged["clause_changes"] == {"added": [], "removed": [], "changed": []}
+    assert (unchanged["sections_reused"], unchanged["sections_analyzed"], unchanged["sections_removed"]) == (1, 1, 1)
+    assert diff_revision(base, reworded, CLAUSE_TYPES)["clause_changes"]["changed"] == ["termination"]
+
+
+def contract(*extra):
+    clauses = [f"{number}. Clause {number} covers obligation {number * 7919} of the parties. " * 12
+               for number in range(1, 31)]
+    return "\n\n".join(clauses[:15] + list(extra) + clauses[15:])
+
+
+def test_revision_of_a_version_analyzed_with_analyze_reuses_its_sections(fake_service):
+    service, calls = fake_service()
+    v1 = contract("16. The seller gives a warranty for one year.")
+    v2 = contract("16. All information shared is confidential.")
+
+    async def main():
+        await service.analyze_document(v1, "english")
+        first_calls = len(calls)
+        revised = await service.analyze_revision(v2, "english", content_hash(v1))
+        await service.aclose()
+        return first_calls, revised
+
+    first_calls, revised = asyncio.run(main())
+    revision = revised["revision"]
+    assert revision["base_found"]
+    assert revision["sections_reused"] >= revision["sections"] - 2
+    assert revision["clause_changes"] == {"added": ["confidentiality"], "removed": ["warranty"], "changed": []}
+    # Only the edited section and the reduce passes over the partial summaries are summarized again
+    assert len(calls) - first_calls < first_calls / 2
+    assert [clause["type"] for clause in revised["clauses"]] == ["confidentiality"]
+
+
+def test_base_id_must_be_one_of_the_callers_own_analyses(history_client, auth_headers, wait_for_history):
+    client, owner = history_client, auth_headers(7)
+    first = client.post("/analyze/revision", data={"text": DOCUMENT}, headers=owner).json()
+    base_id = wait_for_history(client, owner, 1)[0]["id"]
+    revised = {"text": DOCUMENT + "\n\n3. Warranty\nThe seller gives a warranty.", "base_id": base_id}
+
+    assert client.post("/analyze/revision", data=revised).status_code == 401
+    assert client.post("/analyze/revision", data=revised, headers=auth_headers(8)).status_code == 404
+    assert client.post("/analyze/revision", data=dict(revised, base_hash="abc"), headers=owner).status_code == 400
+    response = client.post("/analyze/revision", data=revised, headers=owner)
+    assert response.status_code == 200
+    revision = response.json()["revision"]
+    assert revision["base_found"] and revision["base_hash"] == first["revision"]["content_hash"]
+    assert revision["clause_changes"]["added"] == ["warranty"]
+
@@ -0,0 +1,73 @@
+import asyncio
+import copy
+
+import pytest
+
+from app.services.revisions import manifest_key
+from app.services.rules import RuleRegistry, RulesError
+
+
+@pytest.mark.parametrize("corrupt, message", [
+    (lambda data: data["clauses"]["payment"].update(risk_level="severe"), "unknown risk level"),
+    (lambda data: data["aliases"].update(french="fr"), "unsupported language 'fr'"),
+    (lambda data: data["clauses"]["payment"]["description"].pop("en"), "no 'en' text"),
+    (lambda data: data["texts"]["summary_prompt"].update(hi="no placeholder"), "missing {text}"),
+    (lambda data: data["clauses"].pop("general"), "'general' rule is required"),
+    (lambda data: data["recommendations"]["en"].pop(), "tiers"),
+])
+def test_inconsistent_rules_are_refused(rules_data, corrupt, message):
+    corrupt(rules_data)
+    with pytest.raises(RulesError, match=message):
+        RuleRegistry(rules_data)
+
+
+def test_missing_translations_fall_back_to_the_default_language(rules_data):
+    data = copy.deepcopy(rules_data)
+    del data["clauses"]["payment"]["description"]["ta"]
+    del data["texts"]["mock_summary"]["bn"]
+
+    rules = RuleRegistry(data)
+
+    assert rules.missing == ("clauses.payment.description[ta]", "texts.mock_summary[bn]")
+    assert rules.description("payment", "ta") == data["clauses"]["payment"]["description"]["en"]
+    assert rules.text("mock_summary", "bn") == data["texts"]["mock_summary"]["en"]
+    assert RuleRegistry(rules_data).missing == ()
+
+
+def test_language_names_and_aliases_resolve_to_codes(rules_data):
+    rules = RuleRegistry(rules_data)
+
+    assert rules.resolve_language("english") == "en"
+    assert rules.resolve_language(" Bangla ") == "bn"
+    assert rules.resolve_language("hi") == "hi"
+    assert rules.resolve_language("klingon") == rules.default_language
+    assert rules.resolve_language("") == rules.default_language
+    assert rules.text("mock_summary", "hindi") == rules.text("mock_summary", "hi")
+
+
+def test_rules_fingerprint_follows_rule_content(rules_data):
+    changed = copy.deepcopy(rules_data)
+    changed["clauses"]["termination"]["keywords"].append("rescind")
+
+    assert RuleRegistry(rules_data).fingerprint == RuleRegistry(copy.deepcopy(rules_data)).fingerprint
+    assert RuleRegistry(changed).fingerprint != RuleRegistry(rules_data).fingerprint
+    assert manifest_key("hash", "en", "model", "rules-a") != manifest_key("hash", "en", "model", "rules-b")
+
+
+def test_cached_analyses_are_not_reused_under_other_rules(fake_service, rules_data):
+    service, calls = fake_service()
+    document = "The tenant shall pay the fee monthly."
+
+    async def main():
+        await service.analyze_document(document, "en")
+        await service.analyze_document(document, "en")
+        cached_calls = len(calls)
+        rules_data["clauses"]["payment"]["keywords"].append("rent")
+        service.rules = RuleRegistry(rules_data)
+        await service.analyze_document(document, "en")
+        await service.aclose()
+        return cached_calls
+
+    cached_calls = asyncio.run(main())
+    assert cached_calls == 1
+    assert len(calls) == 2
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.services.metrics import COALESCED_CALLS, REGISTRY
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"summary": "shared"}
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert calls == 1
+    assert flight.collapsed == 4
+    assert len(flight) == 0
+    assert all(result == {"summary": "shared"} for result in results)
+
+
+def test_each_waiter_gets_its_own_copy():
+    async def compute():
+        await asyncio.sleep(0.01)
+        return {"clauses": []}
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("key", compute), flight.do("key", compute))
+
+    first, second = asyncio.run(main())
+    first["revision"] = {}
+    first["clauses"].append("termination")
+    assert second == {"clauses": []}
+
+
+def test_error_reaches_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert len(flight) == 0
+
+
+def test_computation_survives_until_last_waiter_cancels():
+    cancelled = []
+
+    async def compute():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled and len(flight) == 1
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled and len(flight) == 0
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+    asyncio.run(main())
+
+
+def test_new_call_after_completion_recomputes():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        return await flight.do("key", compute), await flight.do("key", compute)
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_collapsed_calls_are_exported_as_a_metric():
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "shared"
+
+    async def main():
+        flight = SingleFlight("test-metric")
+        await asyncio.gather(*(flight.do("key", compute) for _ in range(3)))
+
+    before = COALESCED_CALLS.value(call="test-metric")
+    asyncio.run(main())
+    assert COALESCED_CALLS.value(call="test-metric") == before + 2
+    assert 'legalsimplify_coalesced_calls_total{call="test-metric"} 2' in REGISTRY.render()
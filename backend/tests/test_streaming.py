@@ -0,0 +1,43 @@
+import asyncio
+
+from app.services.cache import analysis_key
+
+DOCUMENT = "The tenant shall pay a penalty for late payment. Either party may terminate this agreement. " * 40
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def test_stream_shares_computation_and_cache_with_analyze(fake_service):
+    service, calls = fake_service(delay=0.02, chunk_cache=False)
+
+    async def main():
+        events, analysis = await asyncio.gather(
+            collect(service.analyze_document_stream(DOCUMENT, "en")),
+            service.analyze_document(DOCUMENT, "en"),
+        )
+        calls_after_both = len(calls)
+        cached = await service.cache.get(analysis_key(DOCUMENT, "en", service.summarization_model,
+                                                      service.rules.fingerprint))
+        again = await collect(service.analyze_document_stream(DOCUMENT, "en"))
+        return events, analysis, calls_after_both, cached, again
+
+    events, analysis, calls_after_both, cached, again = asyncio.run(main())
+    result = events[-1]
+    assert result[0] == "result" and result[1] == analysis and not analysis["degraded"]
+    assert calls_after_both == len(calls) and service._inflight.collapsed == 1
+    assert cached["summary"] == analysis["summary"]
+    assert again[-1] == ("result", analysis)
+    assert any(event == "clause" for event, _ in events)
+
+
+def test_stream_leader_reports_chunk_summaries(fake_service):
+    service, _ = fake_service(delay=0.02, chunk_cache=False)
+    service.settings.summary_chunk_chars = 500
+
+    events = asyncio.run(collect(service.analyze_document_stream(DOCUMENT, "en")))
+
+    chunk_events = [data for event, data in events if event == "chunk_summary"]
+    assert chunk_events and all(data["summary"] == "Short summary." for data in chunk_events)
+    assert events[-1][0] == "result"
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+from app.services.chunking import section_texts
+
+
+def run_reduce(service, chunks):
+    chunk_chars = service.settings.summary_chunk_chars
+    return asyncio.run(service._reduce_summaries(chunks, "en", lambda text: section_texts(text, chunk_chars)))
+
+
+def test_reduce_stops_when_summaries_do_not_shrink(fake_service):
+    # A model that echoes its input never makes the chunk count go down
+    service, calls = fake_service(lambda text: text, chunk_cache=False)
+    chunk_chars = service.settings.summary_chunk_chars
+    chunks = ["word " * (chunk_chars // 5 - 1)] * 4
+
+    summary = run_reduce(service, chunks)
+
+    assert summary is not None
+    assert len(calls) == len(chunks) + 1
+    assert (len(calls[-1][0]), calls[-1][1]) == (chunk_chars, True)
+
+
+def test_reduce_is_capped_at_summary_max_levels(fake_service):
+    # Halving the text makes progress, but would need three levels for eight chunks
+    service, calls = fake_service(lambda text: text[:len(text) // 2], chunk_cache=False)
+    service.settings.summary_max_levels = 2
+    chunk_chars = service.settings.summary_chunk_chars
+    chunks = ["word " * (chunk_chars // 5 - 1)] * 8
+
+    assert run_reduce(service, chunks) is not None
+    assert [final for _, final in calls] == [False] * (8 + 4) + [True]
+
+
+def test_reduce_summarizes_level_by_level(fake_service):
+    service, calls = fake_service(lambda text: "short summary.", chunk_cache=False)
+    chunks = ["clause text. " * 200] * 6
+
+    assert run_reduce(service, chunks) == "short summary."
+    assert [final for _, final in calls] == [False] * 6 + [True]
+
+
+def test_editing_one_clause_re_summarizes_only_the_chunks_around_it(fake_service):
+    service, queried = fake_service()
+    clauses = [f"{number}. Clause {number} covers obligation {number * 7919} of the parties. " * 12
+               for number in range(1, 41)]
+    original = "\n\n".join(clauses)
+    clauses[20] += "An added sentence about late fees."
+    edited = "\n\n".join(clauses)
+
+    async def main():
+        await service._get_summary(original, "en")
+        first = [text for text, final in queried if not final]
+        queried.clear()
+        await service._get_summary(edited, "en")
+        second = [text for text, final in queried if not final]
+        await service.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(first) > 10
+    # The edited chunk, possibly merged with a neighbour, plus the reduce level over the partial summaries
+    assert len(second) <= 3
+    assert any("late fees" in text for text in second)
+
+
+def test_cached_summary_is_combined_with_offsets_into_each_upload(fake_service):
+    service, _ = fake_service(lambda text: "short summary.")
+
+    async def main():
+        first = await service.analyze_document("Intro. The fee is due.", "en")
+        second = await service.analyze_document("Intro.\n\n\n      The fee is due.", "en")
+        await service.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["summary"] == second["summary"] == "short summary."
+    start = second["clauses"][0]["matches"][0]["start"]
+    assert first["clauses"][0]["matches"][0]["start"] != start
+    assert "Intro.\n\n\n      The fee is due."[start:start + 3] == "fee"
+
+
+def test_cached_analysis_of_the_same_text_is_not_scanned_again(fake_service, monkeypatch):
+    service, _ = fake_service(lambda text: "short summary.")
+    scans = []
+    find = service.clause_matcher.find
+    monkeypatch.setattr(service.clause_matcher, "find", lambda text: scans.append(text) or find(text))
+
+    async def main():
+        first = await service.analyze_document("Intro. The fee is due.", "en")
+        scanned = len(scans)
+        second = await service.analyze_document("Intro. The fee is due.", "en")
+        await service.aclose()
+        return first, scanned, second
+
+    first, scanned, second = asyncio.run(main())
+    assert scanned > 0 and len(scans) == scanned
+    assert second == first
+
+
+def test_long_documents_are_scanned_off_the_event_loop(fake_service, monkeypatch):
+    service, _ = fake_service(lambda text: "short summary.")
+    service.settings.clause_scan_thread_chars = 10
+    threads = []
+    find = service.clause_matcher.find
+    monkeypatch.setattr(service.clause_matcher, "find",
+                        lambda text: threads.append(threading.current_thread()) or find(text))
+
+    analysis = asyncio.run(service.analyze_document("Intro. The fee is due.", "en"))
+
+    assert threads and threading.main_thread() not in threads
+    assert analysis["clauses"][0]["type"] == "payment"
+
+
+def test_long_documents_are_summarized_in_full_by_default(fake_service):
+    service, calls = fake_service(lambda text: "short summary.", chunk_cache=False)
+    # About 180k characters, 60-odd pages
+    lease = "\n\n".join(f"{number}. Clause {number} sets obligation {number * 7919} of the parties. " * 30
+                         for number in range(1, 81))
+
+    analysis = asyncio.run(service.analyze_document(lease, "en"))
+
+    chunks = len(section_texts(lease, service.settings.summary_chunk_chars))
+    assert chunks > 48
+    assert analysis["summary_coverage"] == 1.0
+    assert [final for _, final in calls].count(False) >= chunks
+
+
+def test_sampled_documents_report_their_coverage(fake_service, caplog):
+    service, calls = fake_service(lambda text: "short summary.", chunk_cache=False)
+    service.settings.summary_max_chunks = 10
+    lease = "\n\n".join(f"{number}. Clause {number} sets obligation {number * 7919} of the parties. " * 30
+                         for number in range(1, 81))
+
+    analysis = asyncio.run(service.analyze_document(lease, "en"))
+
+    chunks = len(section_texts(lease, service.settings.summary_chunk_chars))
+    assert analysis["summary_coverage"] == 10 / chunks
+    assert any(record.levelname == "WARNING" and "summarizing only 10" in record.message
+               for record in caplog.records)
@@ -0,0 +1,75 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from app.middleware import MaxBodySizeMiddleware
+from app.services.uploads import spool_upload
+
+
+def spool(data, max_size=100, memory_threshold=50, size=None, spool_dir=None):
+    file = UploadFile(io.BytesIO(data), size=size, filename="contract.txt")
+    return asyncio.run(spool_upload(file, max_size, chunk_size=16, memory_threshold=memory_threshold,
+                                    spool_dir=spool_dir))
+
+
+def test_declared_size_over_the_limit_is_refused_before_reading():
+    with pytest.raises(HTTPException) as error:
+        spool(b"x" * 10, size=101)
+    assert error.value.status_code == 413
+
+
+def test_upload_is_refused_once_it_grows_past_the_limit(tmp_path):
+    with pytest.raises(HTTPException) as error:
+        spool(b"x" * 101, spool_dir=str(tmp_path))
+    assert error.value.status_code == 413
+    # The partly spooled file is removed
+    assert os.listdir(tmp_path) == []
+
+
+def test_small_upload_stays_in_memory():
+    upload = spool(b"x" * 50)
+    assert upload.path is None and upload.source == b"x" * 50
+
+
+def test_upload_past_the_threshold_rolls_over_to_disk(tmp_path):
+    upload = spool(b"x" * 51, spool_dir=str(tmp_path))
+    try:
+        assert upload.path is not None and os.path.dirname(upload.path) == str(tmp_path)
+        assert upload.read_bytes() == b"x" * 51
+    finally:
+        upload.close()
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(MaxBodySizeMiddleware, max_body_size=100, path_limits={"/large": 1000})
+
+    @app.post("/small")
+    @app.post("/large")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_content_length_over_the_limit_is_refused(client):
+    response = client.post("/small", content=b"x" * 101)
+    assert response.status_code == 413
+    assert client.post("/small", content=b"x" * 100).json() == {"size": 100}
+
+
+def test_streamed_body_is_refused_once_it_exceeds_the_limit(client):
+    # No Content-Length: the body arrives in chunks and is counted as it is read
+    response = client.post("/small", content=(b"x" * 40 for _ in range(3)))
+    assert response.status_code == 413
+
+
+def test_path_limits_override_the_default(client):
+    assert client.post("/large", content=b"x" * 500).json() == {"size": 500}
+    assert client.post("/large", content=b"x" * 1001).status_code == 413